@@ -0,0 +1,101 @@
+"""
+Currency conversion, percentiles, rolling minimums and round trip totals over
+thousands of calendars: a loop over `Flight` objects versus the columns of
+frenchbee.fares. Requires numpy.
+
+    poetry run python benchmarks/bench_fares.py
+"""
+from array import array
+from datetime import datetime, timedelta
+import timeit
+from typing import Dict, List, Tuple
+
+from frenchbee.calendars import FlightCalendar
+from frenchbee.fares import FareColumns, FxRates
+from frenchbee.models import Flight
+
+CURRENCIES: List[str] = ["USD", "EUR", "XPF"]
+FX: FxRates = FxRates("EUR", {"USD": 0.93, "XPF": 0.0084})
+PERCENTILES: Tuple[float, ...] = (10, 50, 90)
+WINDOW: int = 7
+NIGHTS: Tuple[int, int] = (7, 14)
+
+
+def make_calendar(start: datetime, days: int, seed: int) -> FlightCalendar:
+    first: int = start.toordinal()
+    return FlightCalendar(
+        "EWR",
+        "ORY",
+        CURRENCIES[seed % len(CURRENCIES)],
+        array("l", range(first, first + days)),
+        array(
+            "d",
+            [float(300 + (offset * 37 + seed * 11) % 400) for offset in range(days)],
+        ),
+        array("d", [120.0] * days),
+        array("b", [offset % 7 == 0 for offset in range(days)]),
+    )
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    position: float = (len(ordered) - 1) * q / 100
+    lo: int = int(position)
+    hi: int = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (position - lo)
+
+
+def with_objects(calendars: Dict[str, FlightCalendar]) -> None:
+    converted: Dict[str, Dict[datetime, Flight]] = {}
+    for key, calendar in calendars.items():
+        rate: float = FX.rate(calendar.currency)
+        flights: Dict[datetime, Flight] = calendar.to_flights()
+        for flight in flights.values():
+            flight.price *= rate
+            flight.tax *= rate
+            flight.currency = FX.base
+        converted[key] = flights
+
+    for flights in converted.values():
+        ordered: List[float] = sorted(flight.price for flight in flights.values())
+        [percentile(ordered, q) for q in PERCENTILES]
+        for day in flights:
+            min(
+                flights[day - timedelta(days=back)].price
+                for back in range(WINDOW)
+                if day - timedelta(days=back) in flights
+            )
+
+    keys: List[str] = list(converted)
+    for outbound, inbound in zip(keys[::2], keys[1::2]):
+        departures: Dict[datetime, Flight] = converted[outbound]
+        returns: Dict[datetime, Flight] = converted[inbound]
+        for day, flight in departures.items():
+            for nights in range(NIGHTS[0], NIGHTS[1] + 1):
+                back: Flight = returns.get(day + timedelta(days=nights))
+                if back:
+                    total: float = flight.price + back.price
+                    total / nights
+
+
+def with_columns(calendars: Dict[str, FlightCalendar]) -> None:
+    columns: FareColumns = FareColumns.from_calendars(calendars).convert(FX)
+    columns.stats(PERCENTILES)
+    columns.rolling_min(WINDOW)
+    keys: List[str] = columns.keys
+    for outbound, inbound in zip(keys[::2], keys[1::2]):
+        columns.round_trips(outbound, inbound, *NIGHTS).price_per_night
+
+
+def main(count: int = 2000, days: int = 330) -> None:
+    start: datetime = datetime(2022, 10, 1)
+    calendars: Dict[str, FlightCalendar] = {
+        f"route-{seed}": make_calendar(start, days, seed) for seed in range(count)
+    }
+    print(f"{count} calendars of {days} days")
+    for name, func in (("objects", with_objects), ("columns", with_columns)):
+        runs: List[float] = timeit.repeat(lambda: func(calendars), number=1, repeat=3)
+        print(f"{name}: {min(runs) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
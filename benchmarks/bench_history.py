@@ -0,0 +1,69 @@
+"""
+Write throughput of PriceHistory and latency of its two queries over a store
+with millions of observations.
+
+    poetry run python benchmarks/bench_history.py
+"""
+from datetime import datetime, timedelta
+import os
+import tempfile
+import timeit
+from typing import List
+
+from frenchbee.history import PriceHistory
+from frenchbee.models import Flight, PassengerInfo
+
+ROUTES: List[str] = ["EWR-ORY", "ORY-EWR", "SFO-ORY", "ORY-SFO", "LAX-PPT", "PPT-LAX"]
+
+
+def make_calendar(start: datetime, days: int, seed: int) -> List[Flight]:
+    return [
+        Flight(
+            arrival_airport=None,
+            currency="USD",
+            day=start + timedelta(days=offset),
+            departure_airport=None,
+            is_offer=offset % 7 == 0,
+            price=float(300 + (offset * 37 + seed * 11) % 400),
+            tax=120.0,
+        )
+        for offset in range(days)
+    ]
+
+
+def main(polls: int = 1000, days: int = 330) -> None:
+    path: str = os.path.join(tempfile.mkdtemp(), "history.db")
+    passengers: PassengerInfo = PassengerInfo(Adults=1)
+    start: datetime = datetime(2022, 10, 1)
+    history: PriceHistory = PriceHistory(path, batch_size=50000)
+
+    began: float = timeit.default_timer()
+    for poll in range(polls):
+        observed_at: datetime = start - timedelta(days=30) + timedelta(minutes=poll)
+        for route in ROUTES:
+            history.record(
+                route,
+                passengers,
+                make_calendar(start, days, poll),
+                observed_at=observed_at,
+            )
+    history.flush()
+    seconds: float = timeit.default_timer() - began
+    rows: int = polls * days * len(ROUTES)
+    print(f"{'record + flush':<30} {rows / seconds:>12,.0f} rows/s ({rows:,} rows)")
+
+    cases = [
+        (
+            "price_over_time",
+            lambda: history.price_over_time("SFO-ORY", start + timedelta(days=45)),
+        ),
+        ("cheapest_per_month", lambda: history.cheapest_per_month("SFO-ORY")),
+    ]
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=10, repeat=5)) / 10
+        print(f"{name:<30} {seconds * 1000:>12,.2f} ms")
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Per-call cost of the json path lookups used by FrenchBee, before and after the
+precompiled registry in frenchbee.paths.
+
+    poetry run python benchmarks/bench_json_path.py
+"""
+import timeit
+from typing import Any, Dict
+
+import jsonpath_ng
+
+from frenchbee.paths import compile_path, get_json_path
+
+PATH: str = "$.pageDefinitionConfig.pageData.business.Availability.proposedBounds"
+WILDCARD_PATH: str = "$.pageDefinitionConfig.pageData.business.Availability.proposedBounds[*].proposedFlightsGroup"
+DOCUMENT: Dict[str, Any] = {
+    "pageDefinitionConfig": {
+        "pageData": {
+            "business": {
+                "Availability": {
+                    "proposedBounds": [
+                        {"proposedFlightsGroup": []},
+                        {"proposedFlightsGroup": []},
+                    ]
+                }
+            }
+        }
+    }
+}
+
+
+def parse_every_call(path: str) -> Any:
+    return [match.value for match in jsonpath_ng.parse(path).find(DOCUMENT)]
+
+
+def main(number: int = 200) -> None:
+    compile_path(PATH)
+    compile_path(WILDCARD_PATH)
+    cases = [
+        ("jsonpath_ng.parse per call (dotted)", lambda: parse_every_call(PATH)),
+        ("registry, dict walk (dotted)", lambda: get_json_path(DOCUMENT, PATH)),
+        (
+            "jsonpath_ng.parse per call (wildcard)",
+            lambda: parse_every_call(WILDCARD_PATH),
+        ),
+        (
+            "registry, precompiled (wildcard)",
+            lambda: get_json_path(DOCUMENT, WILDCARD_PATH),
+        ),
+    ]
+    for name, func in cases:
+        seconds: float = min(timeit.repeat(func, number=number, repeat=5)) / number
+        print(f"{name:<40} {seconds * 1e6:>10.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Cost of dumping itineraries with the models' json() methods versus the single
+pass serializer in frenchbee.serialize.
+
+    poetry run python benchmarks/bench_serialize.py
+"""
+from datetime import datetime, timedelta
+import io
+import json
+import timeit
+from typing import List
+
+from frenchbee.models import DateAndLocation, Location, PassengerInfo, Segment, Trip
+from frenchbee.serialize import JsonLinesWriter
+
+
+def make_trip(offset: int) -> Trip:
+    start: datetime = datetime(2022, 10, 6) + timedelta(days=offset % 60)
+
+    def segment(begin: datetime, origin: str, destination: str) -> Segment:
+        return Segment(
+            airline_code="BF",
+            airline_name="French Bee",
+            flight_num=str(700 + offset % 30),
+            duration=26700000,
+            start=DateAndLocation(
+                date=begin + timedelta(hours=2, minutes=55),
+                location=Location(
+                    origin, "Newark Liberty International", "B", "Airbus A350-900"
+                ),
+            ),
+            end=DateAndLocation(
+                date=begin + timedelta(hours=10, minutes=20),
+                location=Location(destination, "Orly", "4"),
+            ),
+        )
+
+    return Trip(
+        origin_depart=DateAndLocation(date=start, location=Location("EWR")),
+        destination_return=DateAndLocation(
+            date=start + timedelta(days=7), location=Location("ORY")
+        ),
+        passengers=PassengerInfo(Adults=1),
+        origin_segments=[[segment(start, "EWR", "ORY")] for _ in range(4)],
+        destination_segments=[
+            [segment(start + timedelta(days=7), "ORY", "EWR")] for _ in range(4)
+        ],
+    )
+
+
+def with_json_methods(trips: List[Trip]) -> str:
+    stream: io.StringIO = io.StringIO()
+    for trip in trips:
+        stream.write(json.dumps(trip.json()))
+        stream.write("\n")
+    return stream.getvalue()
+
+
+def with_writer(trips: List[Trip], backend: str) -> str:
+    stream: io.StringIO = io.StringIO()
+    JsonLinesWriter(stream, backend).write_all(trips)
+    return stream.getvalue()
+
+
+def main(count: int = 2000) -> None:
+    trips: List[Trip] = [make_trip(i) for i in range(count)]
+    cases = [
+        ("json.dumps(trip.json())", lambda: with_json_methods(trips)),
+        ("JsonLinesWriter, json", lambda: with_writer(trips, "json")),
+    ]
+    try:
+        import orjson  # noqa: F401
+
+        cases.append(("JsonLinesWriter, orjson", lambda: with_writer(trips, "orjson")))
+    except ImportError:
+        pass
+
+    for name, func in cases:
+        seconds: float = min(timeit.repeat(func, number=1, repeat=5))
+        print(f"{name:<30} {count / seconds:>12,.0f} trips/s")
+
+
+if __name__ == "__main__":
+    main()
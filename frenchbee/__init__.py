@@ -1,3 +1,49 @@
-from .frenchbee import FrenchBee
-from .data import FrenchBeeData
-from .models import Flight, PassengerInfo, Location, Trip, DateAndLocation
+"""
+The public names below are imported on first use, so that importing the package
+(e.g. for the CLI) does not load requests, bs4 and the clients up front.
+"""
+from importlib import import_module
+from typing import Any, Dict, List
+
+_EXPORTS: Dict[str, str] = {
+    "FrenchBee": ".frenchbee",
+    "AsyncFrenchBee": ".aio",
+    "MemoryCache": ".cache",
+    "SqliteCache": ".cache",
+    "FlightCalendar": ".calendars",
+    "LocationCatalog": ".catalog",
+    "FrenchBeeData": ".data",
+    "BlockedError": ".errors",
+    "CircuitOpenError": ".errors",
+    "FrenchBeeError": ".errors",
+    "UnexpectedResponseError": ".errors",
+    "Instrumentation": ".instrumentation",
+    "MetricsRecorder": ".instrumentation",
+    "OpenTelemetryTracing": ".instrumentation",
+    "PriceMatrix": ".matrix",
+    "RateLimiter": ".ratelimit",
+    "RetryPolicy": ".ratelimit",
+    "Reese84TokenManager": ".reese84",
+    "Transport": ".transport",
+    "Flight": ".models",
+    "PassengerInfo": ".models",
+    "Location": ".models",
+    "Market": ".models",
+    "Trip": ".models",
+    "DateAndLocation": ".models",
+}
+
+__all__: List[str] = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module_name: str = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value: Any = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,114 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from .data import FrenchBeeData
+from .frenchbee import FrenchBee
+from .models import Flight, Location, Trip
+from .transport import DEFAULT_POOL_SIZES, Transport
+
+T = TypeVar("T")
+
+
+class AsyncFrenchBee:
+    """
+    asyncio facade over `FrenchBee` and `FrenchBeeData`. The blocking HTTP calls are
+    run on a thread pool and a semaphore caps how many are in flight at once, so
+    batches of trips are bounded by `concurrency` rather than by serial latency.
+    """
+
+    def __init__(
+        self,
+        client: FrenchBee = None,
+        data_client: FrenchBeeData = None,
+        concurrency: int = 8,
+        executor: ThreadPoolExecutor = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        transport: Transport = (
+            client.transport
+            if client
+            else Transport(
+                pool_sizes={host: concurrency for host in DEFAULT_POOL_SIZES},
+                default_pool_size=concurrency,
+            )
+        )
+        self.client: FrenchBee = client or FrenchBee(transport=transport)
+        self.data_client: FrenchBeeData = data_client or FrenchBeeData(transport)
+        self.concurrency: int = concurrency
+        self._owns_executor: bool = executor is None
+        self.executor: ThreadPoolExecutor = executor or ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="frenchbee"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> "AsyncFrenchBee":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        if self._loop is not loop:  # a semaphore only works on the loop it was used on
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        async with self._semaphore:
+            return await loop.run_in_executor(self.executor, partial(func, *args))
+
+    async def get_departure_availability(self, trip: Trip) -> Dict[datetime, Flight]:
+        return await self._run(self.client.get_departure_availability, trip)
+
+    async def get_return_availability(self, trip: Trip) -> Dict[datetime, Flight]:
+        return await self._run(self.client.get_return_availability, trip)
+
+    async def get_departure_info_for(self, trip: Trip) -> Flight:
+        return await self._run(self.client.get_departure_info_for, trip)
+
+    async def get_return_info_for(self, trip: Trip) -> Flight:
+        return await self._run(self.client.get_return_info_for, trip)
+
+    async def get_flight_times(self, trip: Trip) -> Trip:
+        return await self._run(self.client.get_flight_times, trip)
+
+    async def get_locations(self) -> List[Location]:
+        return await self._run(lambda: list(self.data_client.get_locations()))
+
+    async def gather(
+        self,
+        func: Callable[[Trip], Awaitable[T]],
+        trips: Iterable[Trip],
+        return_exceptions: bool = False,
+    ) -> List[T]:
+        """
+        Run `func` (one of the coroutine methods above) for every trip, at most
+        `concurrency` at a time. Results are returned in the order of `trips`.
+        """
+        return await asyncio.gather(
+            *(func(trip) for trip in trips), return_exceptions=return_exceptions
+        )
+
+    async def gather_departure_availability(
+        self, trips: Iterable[Trip], return_exceptions: bool = False
+    ) -> List[Dict[datetime, Flight]]:
+        return await self.gather(
+            self.get_departure_availability, trips, return_exceptions
+        )
+
+    async def gather_return_availability(
+        self, trips: Iterable[Trip], return_exceptions: bool = False
+    ) -> List[Dict[datetime, Flight]]:
+        return await self.gather(self.get_return_availability, trips, return_exceptions)
+
+    async def gather_flight_times(
+        self, trips: Iterable[Trip], return_exceptions: bool = False
+    ) -> List[Trip]:
+        return await self.gather(self.get_flight_times, trips, return_exceptions)
@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .calendars import FlightCalendar
+from .frenchbee import FrenchBee
+from .models import DateAndLocation, Flight, Location, Market, PassengerInfo, Trip
+
+
+@dataclass
+class TableRow:
+    mix: str
+    market: Market
+    day: datetime
+    price: float
+    tax: float
+    is_offer: bool
+    currency: str
+
+
+@dataclass
+class CalendarTable:
+    """
+    The calendars of one route keyed by (passenger mix, market), where a mix is
+    written adults-children-infants. Keys that got the same prices share one
+    `FlightCalendar`, so the table holds each distinct calendar once.
+    """
+
+    source: str
+    destination: str
+    departure: datetime = None
+    calendars: Dict[Tuple[str, Market], FlightCalendar] = field(default_factory=dict)
+    calls: int = 0  # calendars asked for, after removing repeated keys
+
+    @property
+    def unique(self) -> int:
+        """Distinct calendars held."""
+        return len({id(calendar) for calendar in self.calendars.values()})
+
+    def calendar(self, mix: str, market: Market) -> Optional[FlightCalendar]:
+        return self.calendars.get((mix, market))
+
+    def get(self, mix: str, market: Market, day: datetime) -> Optional[Flight]:
+        calendar: FlightCalendar = self.calendars.get((mix, market))
+        return calendar.get(day) if calendar else None
+
+    def rows(self) -> Iterator[TableRow]:
+        """One row per (mix, market, date), in key then date order."""
+        for (mix, market), calendar in self.calendars.items():
+            for idx, day in enumerate(calendar):
+                yield TableRow(
+                    mix,
+                    market,
+                    day,
+                    calendar.prices[idx],
+                    calendar.taxes[idx],
+                    bool(calendar.offers[idx]),
+                    calendar.currency,
+                )
+
+
+def _signature(calendar: FlightCalendar) -> Tuple[bytes, ...]:
+    return (
+        (calendar.currency or "").encode("utf-8"),
+        calendar.days.tobytes(),
+        calendar.prices.tobytes(),
+        calendar.taxes.tobytes(),
+        calendar.offers.tobytes(),
+    )
+
+
+def fetch_table(
+    client: FrenchBee,
+    source: str,
+    destination: str,
+    mixes: Iterable[PassengerInfo],
+    markets: Iterable[Market] = None,
+    departure: datetime = None,
+    concurrency: int = 8,
+) -> CalendarTable:
+    """
+    Fetch the departure calendar of a route, or its return calendar for
+    `departure`, for every passenger mix and market at once. Calls run on
+    `concurrency` threads over the client's pooled connections, repeated mixes
+    and markets are asked once, and identical calendars are stored once.
+    """
+    unique_mixes: Dict[str, PassengerInfo] = {}
+    for passengers in mixes:
+        unique_mixes.setdefault(passengers.key, passengers)
+    unique_markets: List[Market] = list(dict.fromkeys(markets or [client.market]))
+    keys: List[Tuple[str, Market]] = [
+        (mix, market) for mix in unique_mixes for market in unique_markets
+    ]
+
+    def fetch(key: Tuple[str, Market]) -> FlightCalendar:
+        mix, market = key
+        trip: Trip = Trip(
+            origin_depart=DateAndLocation(date=departure, location=Location(source)),
+            destination_return=DateAndLocation(
+                date=None, location=Location(destination)
+            ),
+            passengers=unique_mixes[mix],
+        )
+        if departure:
+            return client.get_return_calendar(trip, market)
+        return client.get_departure_calendar(trip, market)
+
+    table: CalendarTable = CalendarTable(source, destination, departure)
+    seen: Dict[Tuple[bytes, ...], FlightCalendar] = {}
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(concurrency, len(keys))),
+        thread_name_prefix="frenchbee-batch",
+    ) as executor:
+        for key, calendar in zip(keys, executor.map(fetch, keys)):
+            table.calls += 1
+            if calendar is not None:
+                table.calendars[key] = seen.setdefault(_signature(calendar), calendar)
+    return table
@@ -0,0 +1,216 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from .models import Market, PassengerInfo
+
+
+def cache_key(
+    source: str,
+    destination: str,
+    passengers: PassengerInfo,
+    departure: datetime,
+    module: str,
+    market: Market = None,
+) -> str:
+    departure_date: str = f"{departure:%Y-%m-%d}" if departure else ""
+    parts: List[str] = [
+        source,
+        destination,
+        passengers.key,
+        departure_date,
+        module,
+    ]
+    if market and market != Market():  # keys saved before markets stay valid
+        parts.append(market.key)
+    return "|".join(parts)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def json(self) -> dict:
+        return dict(self.__dict__)
+
+
+class Cache(ABC):
+    """
+    Base class for calendar caches. Entries expire `ttl` seconds after they are
+    set and the least recently used entries are evicted once the cache holds more
+    than `max_entries` entries or `max_bytes` pickled bytes.
+    """
+
+    def __init__(
+        self, ttl: float = 300, max_entries: int = 1024, max_bytes: int = None
+    ) -> None:
+        self.ttl: float = ttl
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.stats: CacheStats = CacheStats()
+        self._lock: threading.Lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float = None) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class MemoryCache(Cache):
+    def __init__(
+        self, ttl: float = 300, max_entries: int = 1024, max_bytes: int = None
+    ) -> None:
+        super().__init__(ttl, max_entries, max_bytes)
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._size: int = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry: Tuple[float, int, Any] = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, size, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._size -= size
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: float = None) -> None:
+        size: int = len(pickle.dumps(value)) if self.max_bytes else 0
+        expires_at: float = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            previous: Tuple[float, int, Any] = self._entries.pop(key, None)
+            if previous:
+                self._size -= previous[1]
+            self._entries[key] = (expires_at, size, value)
+            self._size += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes and self._size > self.max_bytes
+            ):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteCache(Cache):
+    """Cache persisted to a SQLite file so entries survive process restarts."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 300,
+        max_entries: int = 1024,
+        max_bytes: int = None,
+    ) -> None:
+        super().__init__(ttl, max_entries, max_bytes)
+        self.path: str = path
+        self._conn: sqlite3.Connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        now: float = time.time()
+        with self._lock:
+            row: Tuple[bytes, float] = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.stats.hits += 1
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float = None) -> None:
+        blob: bytes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now: float = time.time()
+        expires_at: float = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), expires_at, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        count, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if count <= self.max_entries and (not self.max_bytes or size <= self.max_bytes):
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ).fetchall()
+        evicted = []
+        for key, entry_size in rows:
+            if count <= self.max_entries and (
+                not self.max_bytes or size <= self.max_bytes
+            ):
+                break
+            evicted.append((key,))
+            count -= 1
+            size -= entry_size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        self.stats.evictions += len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
@@ -0,0 +1,192 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .models import Flight
+
+
+class FlightCalendar:
+    """
+    Day by day prices for one route stored as parallel columns: day ordinals,
+    prices, taxes and offer flags, sorted by day. Flight objects are only built
+    on request.
+    """
+
+    __slots__ = (
+        "departure_airport",
+        "arrival_airport",
+        "currency",
+        "days",
+        "prices",
+        "taxes",
+        "offers",
+    )
+
+    def __init__(
+        self,
+        departure_airport: str = None,
+        arrival_airport: str = None,
+        currency: str = None,
+        days: array = None,
+        prices: array = None,
+        taxes: array = None,
+        offers: array = None,
+    ) -> None:
+        self.departure_airport: str = departure_airport
+        self.arrival_airport: str = arrival_airport
+        self.currency: str = currency
+        self.days: array = days if days is not None else array("l")
+        self.prices: array = prices if prices is not None else array("d")
+        self.taxes: array = taxes if taxes is not None else array("d")
+        self.offers: array = offers if offers is not None else array("b")
+
+    @classmethod
+    def from_response(cls, response: Dict[str, Any]) -> Optional["FlightCalendar"]:
+        """Build from the raw `{year: {month: {day: {...}}}}` calendar payload."""
+        if not response:
+            return None
+        rows: List[Tuple[int, float, float, int]] = []
+        first: Dict[str, Any] = None
+        for key_year, months in response.items():
+            year: int = int(key_year)
+            for key_month, days in months.items():
+                month: int = int(key_month)
+                for key_day, flight in days.items():
+                    first = first or flight
+                    rows.append(
+                        (
+                            datetime(year, month, int(key_day)).toordinal(),
+                            float(flight.get("price")),
+                            float(flight.get("tax")),
+                            1 if flight.get("is_offer") else 0,
+                        )
+                    )
+        return cls._from_rows(
+            first.get("departure_airport"),
+            first.get("arrival_airport"),
+            first.get("currency"),
+            rows,
+        )
+
+    @classmethod
+    def from_flights(
+        cls, flights: Dict[datetime, Flight]
+    ) -> Optional["FlightCalendar"]:
+        if not flights:
+            return None
+        first: Flight = next(iter(flights.values()))
+        rows: List[Tuple[int, float, float, int]] = [
+            (day.toordinal(), flight.price, flight.tax, 1 if flight.is_offer else 0)
+            for day, flight in flights.items()
+        ]
+        return cls._from_rows(
+            first.departure_airport, first.arrival_airport, first.currency, rows
+        )
+
+    @classmethod
+    def _from_rows(
+        cls,
+        departure_airport: str,
+        arrival_airport: str,
+        currency: str,
+        rows: List[Tuple[int, float, float, int]],
+    ) -> "FlightCalendar":
+        rows.sort()
+        days, prices, taxes, offers = zip(*rows) if rows else ((), (), (), ())
+        return cls(
+            departure_airport,
+            arrival_airport,
+            currency,
+            array("l", days),
+            array("d", prices),
+            array("d", taxes),
+            array("b", offers),
+        )
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __iter__(self) -> Iterator[datetime]:
+        return (datetime.fromordinal(day) for day in self.days)
+
+    def __contains__(self, day: datetime) -> bool:
+        return self._index(day) is not None
+
+    def _index(self, day: datetime) -> Optional[int]:
+        ordinal: int = day.toordinal()
+        idx: int = bisect_left(self.days, ordinal)
+        if idx < len(self.days) and self.days[idx] == ordinal:
+            return idx
+        return None
+
+    @property
+    def dates(self) -> List[datetime]:
+        return list(self)
+
+    def flight(self, idx: int) -> Flight:
+        return Flight(
+            arrival_airport=self.arrival_airport,
+            currency=self.currency,
+            day=datetime.fromordinal(self.days[idx]),
+            departure_airport=self.departure_airport,
+            is_offer=bool(self.offers[idx]),
+            price=self.prices[idx],
+            tax=self.taxes[idx],
+        )
+
+    def get(self, day: datetime) -> Optional[Flight]:
+        idx: Optional[int] = self._index(day)
+        return self.flight(idx) if idx is not None else None
+
+    def to_flights(self) -> Dict[datetime, Flight]:
+        return {flight.day: flight for flight in map(self.flight, range(len(self)))}
+
+    def min_price(self) -> Optional[float]:
+        return min(self.prices) if self.prices else None
+
+    def argmin(self) -> Optional[int]:
+        return self.prices.index(min(self.prices)) if self.prices else None
+
+    def cheapest(self) -> Optional[Flight]:
+        idx: Optional[int] = self.argmin()
+        return self.flight(idx) if idx is not None else None
+
+    def between(self, start: datetime = None, end: datetime = None) -> "FlightCalendar":
+        """Days from `start` to `end`, both inclusive."""
+        lo: int = bisect_left(self.days, start.toordinal()) if start else 0
+        hi: int = bisect_right(self.days, end.toordinal()) if end else len(self.days)
+        return FlightCalendar(
+            self.departure_airport,
+            self.arrival_airport,
+            self.currency,
+            self.days[lo:hi],
+            self.prices[lo:hi],
+            self.taxes[lo:hi],
+            self.offers[lo:hi],
+        )
+
+    def offers_only(self) -> "FlightCalendar":
+        keep: List[int] = [idx for idx, offer in enumerate(self.offers) if offer]
+        return FlightCalendar(
+            self.departure_airport,
+            self.arrival_airport,
+            self.currency,
+            array("l", [self.days[idx] for idx in keep]),
+            array("d", [self.prices[idx] for idx in keep]),
+            array("d", [self.taxes[idx] for idx in keep]),
+            array("b", [1] * len(keep)),
+        )
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """NumPy arrays sharing the column buffers. Requires numpy to be installed."""
+        import numpy
+
+        return {
+            "days": numpy.frombuffer(
+                self.days, dtype=numpy.dtype(f"i{self.days.itemsize}")
+            ),
+            "prices": numpy.frombuffer(self.prices, dtype=numpy.float64),
+            "taxes": numpy.frombuffer(self.taxes, dtype=numpy.float64),
+            "offers": numpy.frombuffer(self.offers, dtype=numpy.int8).astype(bool),
+        }
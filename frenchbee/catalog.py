@@ -0,0 +1,182 @@
+from bisect import bisect_left
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .models import Location
+
+if TYPE_CHECKING:
+    from requests import Response
+
+    from .data import FrenchBeeData
+
+
+def default_path() -> str:
+    cache_home: str = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "frenchbee", "locations.json")
+
+
+class LocationCatalog:
+    """
+    French Bee locations, kept in a JSON file and indexed by code and by name.
+
+    The file is revalidated with the home page's ETag/Last-Modified once it is
+    older than `max_age` seconds, so most lookups never touch the network. If the
+    site cannot be reached, the last saved locations are used and the check is
+    retried after `retry_after` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        data_client: "FrenchBeeData" = None,
+        max_age: float = 24 * 60 * 60,
+        retry_after: float = 5 * 60,
+    ) -> None:
+        self.path: str = path or default_path()
+        self.max_age: float = max_age
+        self.retry_after: float = retry_after
+        self._retry_at: float = 0  # after a failed check
+        self._data_client: "FrenchBeeData" = data_client
+        self._lock: threading.Lock = threading.Lock()
+        self._state: Dict[str, Any] = None
+        self._by_code: Dict[str, Location] = {}
+        self._by_name: List[Tuple[str, str]] = []  # (lower case name, code), sorted
+
+    @property
+    def data_client(self) -> "FrenchBeeData":
+        if self._data_client is None:
+            from .data import FrenchBeeData
+
+            self._data_client = FrenchBeeData()
+        return self._data_client
+
+    @property
+    def locations(self) -> List[Location]:
+        self._ensure_loaded()
+        return list(self._by_code.values())
+
+    @property
+    def codes(self) -> List[str]:
+        self._ensure_loaded()
+        return list(self._by_code)
+
+    def get(self, code: str) -> Optional[Location]:
+        self._ensure_loaded()
+        return self._by_code.get(code.upper())
+
+    def __contains__(self, code: str) -> bool:
+        return self.get(code) is not None
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._by_code)
+
+    def search(self, prefix: str) -> List[Location]:
+        """Locations whose code or name starts with `prefix`, ignoring case."""
+        self._ensure_loaded()
+        prefix = prefix.lower()
+        matches: Dict[str, Location] = {}
+        location: Optional[Location] = self._by_code.get(prefix.upper())
+        if location:
+            matches[location.code] = location
+        idx: int = bisect_left(self._by_name, (prefix,))
+        while idx < len(self._by_name) and self._by_name[idx][0].startswith(prefix):
+            code: str = self._by_name[idx][1]
+            matches.setdefault(code, self._by_code[code])
+            idx += 1
+        return list(matches.values())
+
+    def refresh(self, force: bool = False) -> bool:
+        """Revalidate against the site. Returns whether the locations changed."""
+        with self._lock:
+            if self._state is None:
+                self._state = self._load()
+            return self._refresh(force)
+
+    def _ensure_loaded(self) -> None:
+        if self._state is not None and not self._is_stale():
+            return
+        with self._lock:
+            if self._state is None:
+                self._state = self._load()
+            if self._is_stale():
+                try:
+                    self._refresh(force=False)
+                except Exception:
+                    if not self._state.get("locations"):
+                        raise  # nothing to fall back on
+                    self._retry_at = time.time() + self.retry_after
+
+    def _is_stale(self) -> bool:
+        now: float = time.time()
+        return (
+            now >= self._retry_at
+            and now - self._state.get("checked_at", 0) >= self.max_age
+        )
+
+    def _refresh(self, force: bool) -> bool:
+        # only imported when the saved copy is missing or stale
+        from .data import LOCATIONS_URL, parse_locations
+        from .transport import raise_for_status
+
+        headers: Dict[str, str] = dict(self.data_client.headers)
+        if not force and self._state.get("locations"):
+            if self._state.get("etag"):
+                headers["if-none-match"] = self._state["etag"]
+            if self._state.get("last_modified"):
+                headers["if-modified-since"] = self._state["last_modified"]
+        resp: "Response" = self.data_client.session.get(LOCATIONS_URL, headers=headers)
+
+        self._state["checked_at"] = time.time()
+        if resp.status_code == 304:
+            self._save()
+            return False
+        raise_for_status(resp)
+        locations: List[Location] = parse_locations(resp.text)
+        changed: bool = [location.json() for location in locations] != self._state.get(
+            "locations"
+        )
+        self._state.update(
+            {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "locations": [location.json() for location in locations],
+            }
+        )
+        self._index()
+        self._save()
+        return changed
+
+    def _load(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    state = json.load(f)
+            except ValueError:
+                state = {}  # a corrupt file is refetched
+        self._state = state
+        self._index()
+        return state
+
+    def _index(self) -> None:
+        self._by_code = {
+            item["code"]: Location(item["code"], item.get("name"))
+            for item in self._state.get("locations") or []
+        }
+        self._by_name = sorted(
+            ((location.name or "").strip().lower(), location.code)
+            for location in self._by_code.values()
+        )
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path: str = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self._state, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
@@ -1,28 +1,84 @@
+import argparse
 from datetime import datetime
-from typing import List
+import os
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from frenchbee import (
-    FrenchBee,
-    Flight,
-    PassengerInfo,
-    Trip,
-    DateAndLocation,
-    Location,
-    FrenchBeeData,
-)
+# only light modules here: the clients (and requests, bs4) are imported by the
+# subcommands that need them
+from frenchbee.catalog import LocationCatalog
+from frenchbee.models import Flight, PassengerInfo, Trip, DateAndLocation, Location
+from frenchbee.serialize import JsonLinesWriter
 
+if TYPE_CHECKING:
+    from frenchbee.frenchbee import FrenchBee
 
-def main() -> None:
-    import argparse
-    from pprint import pprint
+SOCKET_ENV: str = "FRENCHBEE_CLI_SOCKET"
 
-    parser = argparse.ArgumentParser(description="Get French Bee airline prices.")
+# clients kept across calls, so `serve` answers from warm connections and caches
+_shared: Dict[str, Any] = {}
+
+
+def shared_catalog() -> LocationCatalog:
+    if "catalog" not in _shared:
+        _shared["catalog"] = LocationCatalog()
+    return _shared["catalog"]
+
+
+def shared_client() -> "FrenchBee":
+    if "client" not in _shared:
+        from frenchbee.cache import MemoryCache
+        from frenchbee.frenchbee import FrenchBee
+
+        _shared["client"] = FrenchBee(cache=MemoryCache())
+    return _shared["client"]
+
+
+def check_locations(
+    parser: argparse.ArgumentParser, catalog: LocationCatalog, *codes: str
+) -> None:
+    """Reject unknown airport codes, unless the catalog cannot be loaded at all."""
+    try:
+        unknown: List[str] = [code for code in codes if code not in catalog]
+    except Exception:
+        return
+    if unknown:
+        parser.error(f"unknown location: {', '.join(unknown)}")
+
+
+def main(argv: List[str] = None, local: bool = False) -> int:
+    """
+    Run the CLI. Calls are sent to the server at $FRENCHBEE_CLI_SOCKET when one
+    is listening, unless `local` is set, as it is for the calls the server runs.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    socket_path: Optional[str] = os.environ.get(SOCKET_ENV)
+    if socket_path and not local and argv[:1] != ["serve"]:
+        from frenchbee.serve import forward
+
+        code: Optional[int] = forward(socket_path, argv)
+        if code is not None:
+            return code  # otherwise no server is listening, run here
+
+    parser = argparse.ArgumentParser(
+        prog="frenchbee-cli", description="Get French Bee airline prices."
+    )
     subparsers = parser.add_subparsers(dest="command")
 
-    data_parser = subparsers.add_parser("data", help="Get metadata about French Bee locations.")
+    data_parser = subparsers.add_parser(
+        "data", help="Get metadata about French Bee locations."
+    )
     data_parser.add_argument(
         "--locations", action="store_true", help="Get all supported locations."
     )
+    data_parser.add_argument(
+        "--jsonl", action="store_true", help="Print results as JSON Lines."
+    )
+    data_parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Download the locations again instead of using the cached copy.",
+    )
 
     flight_parser = subparsers.add_parser("flight", help="Get flight information.")
     flight_parser.add_argument("origin", help="Origin airport.")
@@ -48,15 +104,331 @@ def main() -> None:
     flight_parser.add_argument(
         "--children", type=int, default=0, help="Number of child passengers. default=0"
     )
+    flight_parser.add_argument(
+        "--jsonl", action="store_true", help="Print results as JSON Lines."
+    )
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="Poll prices and print changes as JSON Lines."
+    )
+    watch_parser.add_argument("origin", help="Origin airport.")
+    watch_parser.add_argument("destination", help="Destination airport.")
+    watch_parser.add_argument(
+        "--departure-date",
+        dest="departure_dates",
+        action="append",
+        type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+        default=[],
+        help="Also watch return prices for this departure date. YYYY-mm-dd, repeatable",
+    )
+    watch_parser.add_argument(
+        "--from",
+        dest="start",
+        type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+        default=None,
+        help="Only watch days from this date. YYYY-mm-dd",
+    )
+    watch_parser.add_argument(
+        "--to",
+        dest="end",
+        type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+        default=None,
+        help="Only watch days up to this date. YYYY-mm-dd",
+    )
+    watch_parser.add_argument(
+        "--passengers",
+        type=int,
+        default=1,
+        help="Number of adult passengers. default=1",
+    )
+    watch_parser.add_argument(
+        "--children", type=int, default=0, help="Number of child passengers. default=0"
+    )
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=300,
+        help="Seconds between polls of near-term dates, far dates are polled less often. default=300",
+    )
+    watch_parser.add_argument(
+        "--state", default=None, help="File to keep the last seen prices in."
+    )
+    watch_parser.add_argument(
+        "--once", action="store_true", help="Poll every calendar once and exit."
+    )
+    watch_parser.add_argument(
+        "--history", default=None, help="SQLite file to record every poll in."
+    )
+
+    history_parser = subparsers.add_parser(
+        "history", help="Query recorded prices as JSON Lines."
+    )
+    history_parser.add_argument("path", help="SQLite file written by watch --history.")
+    history_parser.add_argument("origin", help="Origin airport.")
+    history_parser.add_argument("destination", help="Destination airport.")
+    history_parser.add_argument(
+        "--day",
+        type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+        default=None,
+        help="Print the price of this day over time instead of the cheapest per month. YYYY-mm-dd",
+    )
+    history_parser.add_argument(
+        "--passengers",
+        type=int,
+        default=1,
+        help="Number of adult passengers. default=1",
+    )
+    history_parser.add_argument(
+        "--children", type=int, default=0, help="Number of child passengers. default=0"
+    )
 
-    args = parser.parse_args()
+    sweep_parser = subparsers.add_parser(
+        "sweep", help="Fetch many calendars on several processes as JSON Lines."
+    )
+    sweep_parser.add_argument(
+        "--origin",
+        dest="origins",
+        action="append",
+        default=[],
+        help="Origin airport, repeatable. default=every location",
+    )
+    sweep_parser.add_argument(
+        "--destination",
+        dest="destinations",
+        action="append",
+        default=[],
+        help="Destination airport, repeatable. default=every location",
+    )
+    sweep_parser.add_argument(
+        "--mix",
+        dest="mixes",
+        action="append",
+        default=[],
+        type=PassengerInfo.from_key,
+        help="Passenger mix as adults-children-infants, repeatable. default=1-0-0",
+    )
+    sweep_parser.add_argument(
+        "--departure-date",
+        dest="departure_dates",
+        action="append",
+        type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+        default=[],
+        help="Also fetch return prices for this departure date. YYYY-mm-dd, repeatable",
+    )
+    sweep_parser.add_argument(
+        "--processes", type=int, default=None, help="default=number of CPUs"
+    )
+    sweep_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Requests in flight per process. default=8",
+    )
+    sweep_parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="File to record finished calendars in, to resume an interrupted sweep.",
+    )
+
+    search_parser = subparsers.add_parser(
+        "search", help="Find the cheapest round trips over flexible dates."
+    )
+    search_parser.add_argument("origin", help="Origin airport.")
+    search_parser.add_argument("destination", help="Destination airport.")
+    search_parser.add_argument(
+        "--from",
+        dest="start",
+        type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+        required=True,
+        help="Earliest departure date. YYYY-mm-dd",
+    )
+    search_parser.add_argument(
+        "--to",
+        dest="end",
+        type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+        required=True,
+        help="Latest departure date. YYYY-mm-dd",
+    )
+    search_parser.add_argument(
+        "--nights",
+        type=lambda s: tuple(map(int, s.split("-"))) if "-" in s else (int(s),) * 2,
+        required=True,
+        help="Length of stay as MIN-MAX nights, or a single number.",
+    )
+    search_parser.add_argument(
+        "--count", type=int, default=5, help="Number of trips to print. default=5"
+    )
+    search_parser.add_argument(
+        "--return-floor",
+        type=float,
+        default=0.0,
+        help="Lowest return price to expect, higher values prune more. default=0",
+    )
+    search_parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=None,
+        help="Stop after fetching this many calendars.",
+    )
+    search_parser.add_argument(
+        "--passengers",
+        type=int,
+        default=1,
+        help="Number of adult passengers. default=1",
+    )
+    search_parser.add_argument(
+        "--children", type=int, default=0, help="Number of child passengers. default=0"
+    )
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help=f"Answer CLI calls from a warm process over a local socket, see {SOCKET_ENV}.",
+    )
+    serve_parser.add_argument(
+        "--socket", default=None, help="Socket path. default=$" + SOCKET_ENV
+    )
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+
+    if args.command == "serve":
+        from frenchbee.serve import default_socket_path, serve
+
+        path: str = args.socket or socket_path or default_socket_path()
+        print(f"Listening on {path}, set {SOCKET_ENV}={path} to use it.")
+        sys.stdout.flush()
+        try:
+            serve(path, main)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    catalog: LocationCatalog = shared_catalog()
+    if args.command in ("flight", "watch", "search"):
+        check_locations(parser, catalog, args.origin, args.destination)
+
+    if args.command == "sweep":
+        from frenchbee.sweep import Sweep, plan
+
+        origins: List[str] = args.origins
+        destinations: List[str] = args.destinations
+        if not origins or not destinations:
+            codes: List[str] = catalog.codes
+            origins = origins or codes
+            destinations = destinations or codes
+        routes = [
+            (origin, destination)
+            for origin in origins
+            for destination in destinations
+            if origin != destination
+        ]
+        sweep: Sweep = Sweep(
+            plan(routes, args.mixes or [PassengerInfo(Adults=1)], args.departure_dates),
+            processes=args.processes,
+            concurrency=args.concurrency,
+            checkpoint=args.checkpoint,
+        )
+        writer: JsonLinesWriter = JsonLinesWriter(sys.stdout)
+        try:
+            for result in sweep.run():
+                writer.write(result)
+                writer.flush()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == "watch":
+        from frenchbee.watch import PriceWatcher, WatchState, WatchTarget, split_bands
+
+        passengers: PassengerInfo = PassengerInfo(
+            Adults=args.passengers, Children=args.children
+        )
+        targets: List[WatchTarget] = [
+            band
+            for departure in [None] + args.departure_dates
+            for band in split_bands(
+                WatchTarget(
+                    args.origin,
+                    args.destination,
+                    passengers,
+                    departure=departure,
+                    start=args.start,
+                    end=args.end,
+                )
+            )
+        ]
+        history = None
+        if args.history:
+            from frenchbee.history import PriceHistory
+
+            history = PriceHistory(args.history)
+        watcher: PriceWatcher = PriceWatcher(
+            targets,
+            client=shared_client(),
+            state=WatchState(args.state),
+            base_interval=args.interval,
+            on_poll=history.record_poll if history else None,
+        )
+        try:
+            watcher.run(sys.stdout, once=args.once)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if history:
+                history.close()
+        return 0
+
+    if args.command == "history":
+        from frenchbee.history import PriceHistory
+
+        passengers: PassengerInfo = PassengerInfo(
+            Adults=args.passengers, Children=args.children
+        )
+        route: str = f"{args.origin}-{args.destination}"
+        with PriceHistory(args.path) as history:
+            JsonLinesWriter(sys.stdout).write_all(
+                history.price_over_time(route, args.day, passengers)
+                if args.day
+                else history.cheapest_per_month(route, passengers)
+            )
+        return 0
+
+    if args.command == "search":
+        from frenchbee.search import SearchResult, search_round_trips
+
+        result: SearchResult = search_round_trips(
+            shared_client(),
+            args.origin,
+            args.destination,
+            args.start,
+            args.end,
+            min_nights=args.nights[0],
+            max_nights=args.nights[-1],
+            passengers=PassengerInfo(Adults=args.passengers, Children=args.children),
+            count=args.count,
+            return_floor=args.return_floor,
+            max_requests=args.max_requests,
+        )
+        JsonLinesWriter(sys.stdout).write_all(result.trips)
+        print(
+            f"{result.requests} requests, {result.departures_searched} departures "
+            + f"searched, {result.departures_pruned} pruned",
+            file=sys.stderr,
+        )
+        return 0
 
     if args.command == "data":
-        data_client: FrenchBeeData = FrenchBeeData()
-        data: List[Location] = list(data_client.get_locations())
+        if args.refresh:
+            catalog.refresh(force=True)
+        data: List[Location] = catalog.locations
+        if args.jsonl:
+            JsonLinesWriter(sys.stdout).write_all(data)
+            return 0
         for location in data:
             print(location.json())
-        exit()
+        return 0
 
     trip: Trip = Trip(
         origin_depart=DateAndLocation(
@@ -68,12 +440,21 @@ def main() -> None:
         passengers=PassengerInfo(Adults=args.passengers, Children=args.children),
     )
 
-    client: FrenchBee = FrenchBee()
+    writer: JsonLinesWriter = JsonLinesWriter(sys.stdout) if args.jsonl else None
+    client = shared_client()
     departure_info: Flight = client.get_departure_info_for(trip)
     if departure_info:
-        print(departure_info.json())
+        if writer:
+            writer.write(departure_info)
+        else:
+            print(departure_info.json())
         return_info: Flight = client.get_return_info_for(trip)
         if return_info:
+            if writer:
+                writer.write(return_info)
+                writer.write(client.get_flight_times(trip))
+                return 0
+
             print(return_info.json())
             print(
                 f"Total price: ${departure_info.price + return_info.price} "
@@ -82,8 +463,11 @@ def main() -> None:
             )
 
             trip = client.get_flight_times(trip)
+            from pprint import pprint
+
             pprint(trip.json())
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,29 +1,45 @@
-from typing import Iterable
+from typing import Dict, Iterable, List
+import re
 from bs4 import BeautifulSoup, ResultSet, Tag
 from requests import Response, Session
 
+from .errors import UnexpectedResponseError
 from .models import Location
+from .transport import Transport, raise_for_status
+
+LOCATIONS_URL: str = "https://us.frenchbee.com/en"
+
+# the departure select is a few KB of a page of several hundred
+_LOCATION_SELECT_RE: re.Pattern = re.compile(
+    r'<select[^>]*id="edit-visible-newsearch-flights-from".*?</select>', re.S
+)
+
+
+def parse_locations(html_body: str) -> List[Location]:
+    select_match: re.Match = _LOCATION_SELECT_RE.search(html_body)
+    if not select_match:
+        raise UnexpectedResponseError("The home page has no departure select.")
+
+    soup: BeautifulSoup = BeautifulSoup(select_match.group(0), "html.parser")
+    source_list_tag: Tag = soup.find("select")
+    source_tags: ResultSet = source_list_tag.find_all("option")
+    return [
+        Location(source_tag["value"], source_tag.getText())
+        for source_tag in source_tags
+    ]
 
 
 class FrenchBeeData:
-    def __init__(self) -> None:
-        self.session: Session = Session()
-        self.session.headers = {
+    def __init__(self, transport: Transport = None) -> None:
+        self.transport: Transport = transport or Transport()
+        self.session: Session = self.transport.session
+        self.headers: Dict[str, str] = {
             "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36",
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "Cookie": "base_host=frenchbee.com; market_lang=en; site_origin=us.frenchbee.com",
         }
 
     def get_locations(self) -> Iterable[Location]:
-        url: str = f"https://us.frenchbee.com/en"
-        resp: Response = self.session.get(url)
-
-        soup: BeautifulSoup = BeautifulSoup(resp.text, "html.parser")
-        source_list_tag: Tag = soup.find(
-            "select", id="edit-visible-newsearch-flights-from"
+        resp: Response = raise_for_status(
+            self.session.get(LOCATIONS_URL, headers=self.headers)
         )
-        source_tags: ResultSet = source_list_tag.find_all("option")
-        for source_tag in source_tags:
-            code: str = source_tag["value"]
-            name: str = source_tag.getText()
-            yield Location(code, name)
+        yield from parse_locations(resp.text)
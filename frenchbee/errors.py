@@ -0,0 +1,14 @@
+class FrenchBeeError(Exception):
+    pass
+
+
+class UnexpectedResponseError(FrenchBeeError):
+    """The site answered, but not with the content the client expects."""
+
+
+class BlockedError(FrenchBeeError):
+    """The request was rejected, usually by the anti-bot protection."""
+
+
+class CircuitOpenError(FrenchBeeError):
+    """Requests to a host are paused after repeated failures."""
@@ -0,0 +1,244 @@
+"""
+Fare analytics over many calendars at once. Calendars are flattened into NumPy
+columns, converted to one currency with offline exchange rates, and summarised
+per calendar without building a `Flight` per day. Requires numpy to be installed.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+import json
+from typing import Dict, Hashable, Iterable, List, Mapping, Tuple
+
+import numpy
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .calendars import FlightCalendar
+
+
+class FxRates:
+    """Offline exchange rates: `rates[currency]` is the value of one unit in `base`."""
+
+    def __init__(self, base: str, rates: Mapping[str, float]) -> None:
+        self.base: str = base
+        self.rates: Dict[str, float] = {**rates, base: 1.0}
+
+    @classmethod
+    def load(cls, path: str) -> "FxRates":
+        """Read a JSON file shaped like `{"base": "EUR", "rates": {"USD": 0.93}}`."""
+        with open(path) as f:
+            table: Dict[str, object] = json.load(f)
+        return cls(table["base"], table["rates"])
+
+    def rate(self, currency: str) -> float:
+        try:
+            return self.rates[currency]
+        except KeyError:
+            raise ValueError(f"No exchange rate from {currency} to {self.base}.")
+
+
+@dataclass
+class FareStats:
+    keys: List[Hashable]
+    currencies: List[str]
+    minimum: numpy.ndarray
+    percentiles: Dict[float, numpy.ndarray]  # percentile => value per calendar
+
+    def get(self, key: Hashable) -> Dict[str, float]:
+        idx: int = self.keys.index(key)
+        output: Dict[str, float] = {"min": float(self.minimum[idx])}
+        for q, values in self.percentiles.items():
+            output[f"p{q:g}"] = float(values[idx])
+        return output
+
+
+@dataclass
+class RoundTripFares:
+    """Bookable (departure, return) pairs of two calendars, as day ordinals."""
+
+    departures: numpy.ndarray
+    returns: numpy.ndarray
+    totals: numpy.ndarray
+
+    @property
+    def nights(self) -> numpy.ndarray:
+        return self.returns - self.departures
+
+    @property
+    def price_per_night(self) -> numpy.ndarray:
+        return self.totals / self.nights
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+    def cheapest(self, count: int = 5) -> List[Tuple[datetime, datetime, float]]:
+        order: numpy.ndarray = numpy.lexsort((self.departures, self.totals))[:count]
+        return [
+            (
+                datetime.fromordinal(int(self.departures[idx])),
+                datetime.fromordinal(int(self.returns[idx])),
+                float(self.totals[idx]),
+            )
+            for idx in order
+        ]
+
+
+@dataclass
+class FareColumns:
+    """
+    Many calendars as flat columns with one row per calendar day. The rows of
+    `keys[i]` are `offsets[i]:offsets[i + 1]`, sorted by day, and priced in
+    `currencies[i]`.
+    """
+
+    keys: List[Hashable]
+    currencies: List[str]
+    offsets: numpy.ndarray
+    days: numpy.ndarray
+    prices: numpy.ndarray
+    taxes: numpy.ndarray
+    offers: numpy.ndarray
+
+    @classmethod
+    def from_calendars(
+        cls, calendars: Mapping[Hashable, FlightCalendar]
+    ) -> "FareColumns":
+        """Empty and missing calendars are left out."""
+        items: List[Tuple[Hashable, FlightCalendar]] = [
+            (key, calendar) for key, calendar in calendars.items() if calendar
+        ]
+        columns: List[Dict[str, numpy.ndarray]] = [
+            calendar.to_numpy() for _, calendar in items
+        ]
+        lengths: List[int] = [len(calendar) for _, calendar in items]
+
+        def concat(name: str, dtype: type) -> numpy.ndarray:
+            if not columns:
+                return numpy.empty(0, dtype=dtype)
+            return numpy.concatenate([column[name] for column in columns]).astype(
+                dtype, copy=False
+            )
+
+        return cls(
+            keys=[key for key, _ in items],
+            currencies=[calendar.currency for _, calendar in items],
+            offsets=numpy.concatenate(([0], numpy.cumsum(lengths, dtype=numpy.int64))),
+            days=concat("days", numpy.int64),
+            prices=concat("prices", numpy.float64),
+            taxes=concat("taxes", numpy.float64),
+            offers=concat("offers", bool),
+        )
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def lengths(self) -> numpy.ndarray:
+        return numpy.diff(self.offsets)
+
+    @property
+    def calendar_index(self) -> numpy.ndarray:
+        """The calendar of every row."""
+        return numpy.repeat(numpy.arange(len(self.keys)), self.lengths)
+
+    def rows(self, key: Hashable) -> slice:
+        idx: int = self.keys.index(key)
+        return slice(int(self.offsets[idx]), int(self.offsets[idx + 1]))
+
+    def convert(self, fx: FxRates) -> "FareColumns":
+        """Prices and taxes in `fx.base`."""
+        rates: numpy.ndarray = numpy.array(
+            [fx.rate(currency) for currency in self.currencies], dtype=numpy.float64
+        )
+        per_row: numpy.ndarray = numpy.repeat(rates, self.lengths)
+        return FareColumns(
+            keys=self.keys,
+            currencies=[fx.base] * len(self.keys),
+            offsets=self.offsets,
+            days=self.days,
+            prices=self.prices * per_row,
+            taxes=self.taxes * per_row,
+            offers=self.offers,
+        )
+
+    def stats(self, percentiles: Iterable[float] = (10, 50, 90)) -> FareStats:
+        """
+        Cheapest price and price percentiles of every calendar, interpolated
+        linearly like `numpy.percentile`.
+        """
+        starts: numpy.ndarray = self.offsets[:-1]
+        lengths: numpy.ndarray = self.lengths
+        minimum: numpy.ndarray = (
+            numpy.minimum.reduceat(self.prices, starts) if len(self) else numpy.empty(0)
+        )
+        # sort prices within each calendar, then index every calendar at once
+        ordered: numpy.ndarray = self.prices[
+            numpy.lexsort((self.prices, self.calendar_index))
+        ]
+        values: Dict[float, numpy.ndarray] = {}
+        for q in percentiles:
+            position: numpy.ndarray = starts + (lengths - 1) * (q / 100)
+            lo: numpy.ndarray = numpy.floor(position).astype(numpy.int64)
+            hi: numpy.ndarray = numpy.ceil(position).astype(numpy.int64)
+            values[q] = ordered[lo] + (ordered[hi] - ordered[lo]) * (position - lo)
+        return FareStats(list(self.keys), list(self.currencies), minimum, values)
+
+    def rolling_min(self, window: int) -> numpy.ndarray:
+        """
+        For every row, the cheapest price of its calendar over the `window` days
+        ending on that row's day. Days without a flight are skipped over.
+        """
+        if not len(self):
+            return numpy.empty(0)
+        starts: numpy.ndarray = self.offsets[:-1]
+        first: numpy.ndarray = self.days[starts]
+        spans: numpy.ndarray = self.days[self.offsets[1:] - 1] - first + 1
+        # lay the calendars out day by day, each after `window - 1` empty days so
+        # that no window reaches into the previous calendar
+        bases: numpy.ndarray = numpy.concatenate(
+            ([0], numpy.cumsum(spans + window - 1)[:-1])
+        ) + (window - 1)
+        positions: numpy.ndarray = numpy.repeat(bases - first, self.lengths) + self.days
+        dense: numpy.ndarray = numpy.full(
+            int(bases[-1] + spans[-1]), numpy.inf, dtype=numpy.float64
+        )
+        dense[positions] = self.prices
+        windows: numpy.ndarray = sliding_window_view(dense, window).min(axis=1)
+        return windows[positions - (window - 1)]
+
+    def round_trips(
+        self,
+        outbound: Hashable,
+        inbound: Hashable,
+        min_nights: int,
+        max_nights: int,
+    ) -> RoundTripFares:
+        """
+        Every pair of an `outbound` day and an `inbound` day `min_nights` to
+        `max_nights` later, with the total of both prices. `inbound` is a calendar
+        of the way back, e.g. the reverse route's departure calendar.
+        """
+        if min_nights < 1:
+            raise ValueError("min_nights must be at least 1.")
+        out_rows: slice = self.rows(outbound)
+        in_rows: slice = self.rows(inbound)
+        out_days: numpy.ndarray = self.days[out_rows]
+        out_prices: numpy.ndarray = self.prices[out_rows]
+        in_days: numpy.ndarray = self.days[in_rows]
+        in_prices: numpy.ndarray = self.prices[in_rows]
+
+        departures: List[numpy.ndarray] = [numpy.empty(0, dtype=numpy.int64)]
+        returns: List[numpy.ndarray] = [numpy.empty(0, dtype=numpy.int64)]
+        totals: List[numpy.ndarray] = [numpy.empty(0)]
+        for nights in range(min_nights, max_nights + 1) if len(in_days) else ():
+            target: numpy.ndarray = out_days + nights
+            idx: numpy.ndarray = numpy.minimum(
+                numpy.searchsorted(in_days, target), len(in_days) - 1
+            )
+            found: numpy.ndarray = in_days[idx] == target
+            departures.append(out_days[found])
+            returns.append(target[found])
+            totals.append(out_prices[found] + in_prices[idx[found]])
+        return RoundTripFares(
+            numpy.concatenate(departures),
+            numpy.concatenate(returns),
+            numpy.concatenate(totals),
+        )
@@ -1,14 +1,43 @@
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+import itertools
 import json
+import os
 from requests import Session, Response
-from typing import Any, Iterable, List, Tuple, Union, Dict
+from typing import Any, Callable, Iterable, Iterator, List, Tuple, Union, Dict
 import re
 import html
-import jsonpath_ng as jsonpath
 
-from .reese84 import FrenchBeeReese84
-from .models import Location, PassengerInfo, Flight, DateAndLocation, Segment, Trip
+from .cache import Cache, cache_key
+from .calendars import FlightCalendar
+from .errors import UnexpectedResponseError
+from .instrumentation import NOOP, ByteCounter, Instrumentation
+from .reese84 import FrenchBeeReese84, Reese84TokenManager
+from .matrix import PriceMatrix
+from .paths import get_json_path
+from .singleflight import SingleFlight
+from .stream import iter_proposed_bounds
+from .transport import Transport, raise_for_status
+from .models import (
+    Location,
+    Market,
+    PassengerInfo,
+    Flight,
+    DateAndLocation,
+    Segment,
+    Trip,
+)
+
+_FORM_ACTION_RE: re.Pattern = re.compile(r'<form[^>]*action="([^"]+)"[^>]*>')
+_FORM_INPUT_RE: re.Pattern = re.compile(
+    r'<input[^>]*name="([^"]+)"[^>]*value="([^"]+)"[^>]*>'
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_datetime_gmt(value: str) -> datetime:
+    return datetime.strptime(value, "%b %d, %Y %I:%M:%S %p")
 
 
 @dataclass
@@ -23,15 +52,30 @@ class FrenchBeeResponse:
 
 
 class FrenchBee:
-    def __init__(self) -> None:
-        self.session = Session()
-        self.session.headers = {
+    def __init__(
+        self,
+        cache: Cache = None,
+        tokens: Reese84TokenManager = None,
+        transport: Transport = None,
+        singleflight: SingleFlight = None,
+        instrumentation: Instrumentation = None,
+        debug_dir: str = None,
+        market: Market = None,
+    ) -> None:
+        self.cache: Cache = cache
+        self.market: Market = market or Market()
+        self.instrumentation: Instrumentation = instrumentation or NOOP
+        self.debug_dir: str = debug_dir  # where to dump flight times responses
+        self.singleflight: SingleFlight = singleflight or SingleFlight()
+        self.transport: Transport = transport or Transport()
+        self.tokens: Reese84TokenManager = tokens or Reese84TokenManager(
+            FrenchBeeReese84(self.transport)
+        )
+        self.session: Session = self.transport.session
+        self.headers: Dict[str, str] = {
             "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36",
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
         }
-        self.session.cookies["base_host"] = "frenchbee.com"
-        self.session.cookies["market_lang"] = "en"
-        self.session.cookies["site_origin"] = "us.frenchbee.com"
 
     def _make_search_request(
         self,
@@ -41,8 +85,10 @@ class FrenchBee:
         departure: datetime,
         returns: datetime,
         module: str,
+        market: Market = None,
     ) -> List[FrenchBeeResponse]:
-        url: str = "https://us.frenchbee.com/en?ajax_form=1"
+        market = market or self.market
+        url: str = market.search_url
         departure_date: str = f"{departure:%Y-%m-%d}" if departure else ""
         return_date: str = f"{returns:%Y-%m-%d}" if returns else ""
         payload: Dict[str, Any] = {
@@ -61,7 +107,36 @@ class FrenchBee:
             "form_id": "frenchbee-amadeus-search-flights-form",
             "_triggering_element_name": module,
         }
-        response: Response = self.session.post(url, data=payload)
+        key: Tuple[Any, ...] = (url, market) + tuple(
+            sorted((name, str(value)) for name, value in payload.items())
+        )
+        return self.singleflight.do(
+            key, lambda: self._post_search(url, payload, market)
+        )
+
+    def _post_search(
+        self, url: str, payload: Dict[str, Any], market: Market
+    ) -> List[FrenchBeeResponse]:
+        self.transport.add_host(market.site_origin)
+        with self.instrumentation.span(
+            "search", module=payload["_triggering_element_name"]
+        ) as span:
+            response: Response = raise_for_status(
+                self.session.post(
+                    url,
+                    data=payload,
+                    headers=self.headers,
+                    cookies=market.cookies,
+                    idempotent=True,  # a search, safe to send again
+                )
+            )
+            span.set("bytes", len(response.content))
+            try:
+                commands: List[Dict[str, Any]] = response.json()
+            except ValueError as ex:
+                raise UnexpectedResponseError(
+                    f"{url} did not answer with JSON commands."
+                ) from ex
         return [
             FrenchBeeResponse(
                 command=resp.get("command"),
@@ -70,7 +145,7 @@ class FrenchBee:
                 args=resp.get("args") or [],
                 data=resp.get("data"),
             )
-            for resp in response.json()
+            for resp in commands
         ]
 
     def _normalize_response(self, response: Dict[str, Any]) -> Dict[datetime, Flight]:
@@ -93,11 +168,11 @@ class FrenchBee:
                     key_day,
                     flight,
                 ) in days.items():  # key_day: str, flight: Dict[str, Any]
-                    day: int = int(key_day)
-                    normalize[datetime(year, month, day)] = Flight(
+                    day: datetime = datetime(year, month, int(key_day))
+                    normalize[day] = Flight(
                         arrival_airport=flight.get("arrival_airport"),
                         currency=flight.get("currency"),
-                        day=datetime.strptime(flight.get("day"), "%Y-%m-%d"),
+                        day=day,
                         departure_airport=flight.get("departure_airport"),
                         is_offer=flight.get("is_offer"),
                         price=float(flight.get("price")),
@@ -105,41 +180,96 @@ class FrenchBee:
                     )
         return normalize
 
-    def get_departure_availability(self, trip: Trip) -> Dict[datetime, Flight]:
+    def _get_calendar(
+        self,
+        trip: Trip,
+        departure: datetime,
+        module: str,
+        event: str,
+        direction: str,
+        columnar: bool = False,
+        market: Market = None,
+    ) -> Union[Dict[datetime, Flight], FlightCalendar]:
+        source: str = trip.origin_depart.location.code
+        destination: str = trip.destination_return.location.code
+        market = market or self.market
+        key: str = None
+        if self.cache is not None:
+            key = cache_key(
+                source, destination, trip.passengers, departure, module, market
+            )
+            key = f"{key}|columnar" if columnar else key
+            cached: Dict[datetime, Flight] = self.cache.get(key)
+            if cached is not None:
+                return cached
+
         payload: List[FrenchBeeResponse] = self._make_search_request(
-            source=trip.origin_depart.location.code,
-            destination=trip.destination_return.location.code,
+            source=source,
+            destination=destination,
             passengers=trip.passengers,
-            departure=None,
+            departure=departure,
             returns=None,
-            module="visible_newsearch_flights_to",
+            module=module,
+            market=market,
         )
         info: FrenchBeeResponse = next(
-            filter(lambda r: r.args[0] == "departureCalendarPriceIsReady", payload),
+            filter(lambda r: r.args and r.args[0] == event, payload),
             None,
         )
-        return (
-            self._normalize_response(info.args[1].get("departure"))
+        if info is None:
+            return None
+        normalize: Callable[[Dict[str, Any]], Any] = (
+            FlightCalendar.from_response if columnar else self._normalize_response
+        )
+        calendar: Union[Dict[datetime, Flight], FlightCalendar] = (
+            normalize(info.args[1].get(direction))
             if len(info.args) >= 2 and info.args[1]
             else None
         )
+        if key is not None and calendar is not None:
+            self.cache.set(key, calendar)
+        return calendar
+
+    def get_departure_availability(self, trip: Trip) -> Dict[datetime, Flight]:
+        return self._get_calendar(
+            trip,
+            departure=None,
+            module="visible_newsearch_flights_to",
+            event="departureCalendarPriceIsReady",
+            direction="departure",
+        )
 
     def get_return_availability(self, trip: Trip) -> Dict[datetime, Flight]:
-        payload: List[FrenchBeeResponse] = self._make_search_request(
-            source=trip.origin_depart.location.code,
-            destination=trip.destination_return.location.code,
-            passengers=trip.passengers,
+        return self._get_calendar(
+            trip,
             departure=trip.origin_depart.date,
-            returns=None,
             module="visible_newsearch_flights_departure_date",
+            event="returnCalendarPriceIsReady",
+            direction="return",
         )
-        info: FrenchBeeResponse = next(
-            filter(lambda i: i.args[0] == "returnCalendarPriceIsReady", payload), None
+
+    def get_departure_calendar(
+        self, trip: Trip, market: Market = None
+    ) -> FlightCalendar:
+        return self._get_calendar(
+            trip,
+            departure=None,
+            module="visible_newsearch_flights_to",
+            event="departureCalendarPriceIsReady",
+            direction="departure",
+            columnar=True,
+            market=market,
         )
-        return (
-            self._normalize_response(info.args[1].get("return"))
-            if len(info.args) >= 2 and info.args[1]
-            else None
+
+    def get_return_calendar(self, trip: Trip, market: Market = None) -> FlightCalendar:
+        return self._get_calendar(
+            trip,
+            departure=trip.origin_depart.date,
+            module="visible_newsearch_flights_departure_date",
+            event="returnCalendarPriceIsReady",
+            direction="return",
+            columnar=True,
+            market=market,
         )
 
     def get_departure_info_for(self, trip: Trip) -> Flight:
@@ -150,31 +280,114 @@ class FrenchBee:
         info: Dict[datetime, Flight] = self.get_return_availability(trip)
         return info.get(trip.destination_return.date) if info else None
 
-    def get_flight_times(self, trip: Trip) -> Trip:
-        form_url, form_inputs = self._get_flight_times_form_parameters(trip)
+    def get_price_matrix(
+        self,
+        route: Tuple[Location, Location],
+        passengers: PassengerInfo,
+        date_range: Tuple[datetime, datetime],
+        return_range: Tuple[datetime, datetime] = None,
+    ) -> PriceMatrix:
+        """
+        Departures within `date_range`, each paired with every later return
+        day, or only those within `return_range` when given.
+        """
+        source, destination = route
+        start, end = date_range
+        return_start, return_end = return_range or (None, None)
+        trip: Trip = Trip(
+            origin_depart=DateAndLocation(date=None, location=source),
+            destination_return=DateAndLocation(date=None, location=destination),
+            passengers=passengers,
+        )
+        departures: Dict[datetime, Flight] = self.get_departure_availability(trip) or {}
+        departures = {
+            day: flight for day, flight in departures.items() if start <= day <= end
+        }
 
-        token: str = FrenchBeeReese84().token()
-        self.session.cookies.set("reese84", token, domain="vols.frenchbee.com")
-        response: Response = self.session.post(form_url, data=form_inputs)
+        returns: Dict[datetime, Dict[datetime, Flight]] = {}
+        for day in sorted(departures):
+            trip.origin_depart.date = day
+            flights: Dict[datetime, Flight] = self.get_return_availability(trip) or {}
+            returns[day] = {
+                return_day: flight
+                for return_day, flight in flights.items()
+                if return_day >= day
+                and (not return_start or return_day >= return_start)
+                and (not return_end or return_day <= return_end)
+            }
+        return PriceMatrix.from_calendars(departures, returns)
 
-        html_body: str = response.text
-        script: Dict[str, Any] = self._get_flight_times_script(html_body)
-        with open("s.json", "w") as f:
-            f.write(json.dumps(script, indent=4, sort_keys=True))
+    def get_flight_times(self, trip: Trip) -> Trip:
+        trip.origin_segments = []
+        trip.destination_segments = []
+        for bound, option in self.iter_flight_times(trip):
+            if bound == 0:
+                trip.origin_segments.append(option)
+            else:
+                trip.destination_segments.append(option)
+        return trip
 
-        bounds: List[Dict[str, Any]] = self._get_json_path(
-            script,
-            "$.pageDefinitionConfig.pageData.business.Availability.proposedBounds",
-        )
-        departure_options: List[Dict[str, Any]] = bounds[0].get(
-            "proposedFlightsGroup", []
-        )
-        return_options: List[Dict[str, Any]] = bounds[1].get("proposedFlightsGroup", [])
+    def iter_flight_times(self, trip: Trip) -> Iterator[Tuple[int, List[Segment]]]:
+        """
+        Yield the flight options of a trip as `(bound, segments)`, bound 0 being
+        the way out and 1 the way back, as soon as each bound of the response is
+        parsed. The reese84 token is fetched while the booking form is searched.
+        """
+        instrumentation: Instrumentation = self.instrumentation
+        self.tokens.prefetch()
+        with instrumentation.span("form_parameters"):
+            form_url, form_inputs = self._get_flight_times_form_parameters(trip)
 
-        trip.origin_segments = list(self._get_segment_options(departure_options))
-        trip.destination_segments = list(self._get_segment_options(return_options))
+        with instrumentation.span("token"):
+            token: str = self.tokens.token()
+        self.session.cookies.set("reese84", token, domain="vols.frenchbee.com")
+        with instrumentation.span("form_post"):
+            response: Response = self.session.post(
+                form_url, data=form_inputs, headers=self.headers, stream=True
+            )
+        bounds: List[Dict[str, Any]] = []
+        with response:
+            if response.status_code == 403:
+                self.tokens.invalidate()  # the next attempt fetches a new token
+            raise_for_status(response)
+            chunks: Iterator[str] = self._iter_flight_times_chunks(response)
+            counter: ByteCounter = ByteCounter(response.encoding)
+            if instrumentation.enabled:
+                chunks = counter.wrap(chunks)
+            proposed: Iterator[Dict[str, Any]] = iter_proposed_bounds(chunks)
+            for idx in itertools.count():
+                # one span per bound read, so the caller's time between options
+                # is left out; the last one reads the rest of the response
+                with instrumentation.span("bounds") as span:
+                    bound: Dict[str, Any] = next(proposed, None)
+                    if bound is None:
+                        # drain the rest so the connection goes back to the pool
+                        for _ in chunks:
+                            pass
+                    counter.flush(span)
+                if bound is None:
+                    break
+                if self.debug_dir:
+                    bounds.append(bound)
+                with instrumentation.span("segments"):
+                    options: List[List[Segment]] = list(
+                        self._get_segment_options(bound.get("proposedFlightsGroup", []))
+                    )
+                for option in options:
+                    yield idx, option
+        if self.debug_dir:
+            self._dump_bounds(trip, bounds)
 
-        return trip
+    def _dump_bounds(self, trip: Trip, bounds: List[Dict[str, Any]]) -> None:
+        os.makedirs(self.debug_dir, exist_ok=True)
+        name: str = "{}-{}-{:%Y-%m-%d}-{:%Y-%m-%d}.json".format(
+            trip.origin_depart.location.code,
+            trip.destination_return.location.code,
+            trip.origin_depart.date,
+            trip.destination_return.date,
+        )
+        with open(os.path.join(self.debug_dir, name), "w") as f:
+            f.write(json.dumps(bounds, indent=4, sort_keys=True))
 
     def _get_flight_times_form_parameters(
         self, trip: Trip
@@ -188,25 +401,28 @@ class FrenchBee:
             module="op",
         )
         resp: FrenchBeeResponse = next(
-            filter(lambda i: i.command == "insert", payload), None
+            filter(lambda i: i.command == "insert" and i.data, payload), None
         )
+        if resp is None:
+            raise UnexpectedResponseError("The search did not return a booking form.")
 
-        form_match: re.Match = re.search(
-            '\<form[^\>]*action="([^"]+)"[^\>]*>', resp.data
-        )
+        form_match: re.Match = _FORM_ACTION_RE.search(resp.data)
         if not form_match:
-            return
+            raise UnexpectedResponseError("The booking form has no action URL.")
         form_url: str = form_match.group(1)
 
-        input_match: List[Tuple[str, str]] = re.findall(
-            '\<input[^\>]*name="([^"]+)"[^\>]*value="([^"]+)"[^\>]*>', resp.data
-        )
+        input_match: List[Tuple[str, str]] = _FORM_INPUT_RE.findall(resp.data)
         form_inputs: Dict[str, str] = {key: value for key, value in input_match}
         if "EXTERNAL_ID" in form_inputs:
             form_inputs["EXTERNAL_ID"] = html.unescape(form_inputs["EXTERNAL_ID"])
 
         return (form_url, form_inputs)
 
+    def _iter_flight_times_chunks(self, response: Response) -> Iterator[str]:
+        if response.encoding is None:
+            response.encoding = "utf-8"
+        return iter(response.iter_content(chunk_size=64 * 1024, decode_unicode=True))
+
     def _get_flight_times_script(self, html_body: str) -> Dict[str, Any]:
         script_start: str = "PlnextPageProvider.init("
         idx_start: int = html_body.index(script_start) + len(script_start)
@@ -227,8 +443,13 @@ class FrenchBee:
     def _get_segment_options(
         self, options: List[Dict[str, Any]]
     ) -> Iterable[List[Segment]]:
+        """
+        Segments of each option, each with its own `Location`s and
+        `DateAndLocation`s. Only the parsed times, which are immutable, are
+        cached across options.
+        """
         for option in options:
-            segments_for_option: List[Segment] = option.get("segments", [])
+            segments_for_option: List[Dict[str, Any]] = option.get("segments", [])
             segments: List[Segment] = []
             for segment_option in segments_for_option:
                 segment: Segment = Segment(
@@ -236,45 +457,42 @@ class FrenchBee:
                     airline_name=segment_option.get("airline", {}).get("name"),
                     flight_num=segment_option.get("flightNumber"),
                     duration=int(segment_option.get("segmentTime") or "0"),
-                    start=DateAndLocation(
-                        date=self._get_datetime_gmt(segment_option.get("beginDateGMT")),
-                        location=Location(
-                            code=segment_option.get("beginLocation", {}).get(
-                                "locationCode"
-                            ),
-                            name=segment_option.get("beginLocation", {}).get(
-                                "locationName"
-                            ),
-                            terminal=segment_option.get("beginTerminal"),
-                            transport=segment_option.get("equipment", {}).get("name"),
-                        ),
+                    start=self._get_date_and_location(
+                        segment_option.get("beginDateGMT"),
+                        segment_option.get("beginLocation", {}),
+                        segment_option.get("beginTerminal"),
+                        segment_option.get("equipment", {}).get("name"),
                     ),
-                    end=DateAndLocation(
-                        date=self._get_datetime_gmt(segment_option.get("endDateGMT")),
-                        location=Location(
-                            code=segment_option.get("endLocation", {}).get(
-                                "locationCode"
-                            ),
-                            name=segment_option.get("endLocation", {}).get(
-                                "locationName"
-                            ),
-                            terminal=segment_option.get("endTerminal"),
-                        ),
+                    end=self._get_date_and_location(
+                        segment_option.get("endDateGMT"),
+                        segment_option.get("endLocation", {}),
+                        segment_option.get("endTerminal"),
                     ),
                 )
                 segments.append(segment)
             yield segments
 
+    def _get_date_and_location(
+        self,
+        date: str,
+        location: Dict[str, Any],
+        terminal: str,
+        transport: str = None,
+    ) -> DateAndLocation:
+        return DateAndLocation(
+            date=self._get_datetime_gmt(date),
+            location=Location(
+                code=location.get("locationCode"),
+                name=location.get("locationName"),
+                terminal=terminal,
+                transport=transport,
+            ),
+        )
+
     def _get_json_path(self, json_object: Any, path: str, default: Any = None) -> Any:
-        extractor = jsonpath.parse(path)  # no type given
-        matches = extractor.find(json_object)
-        if matches:
-            if len(matches) == 1:
-                return matches[0].value
-            return [match.value for match in matches]
-        return default
+        return get_json_path(json_object, path, default)
 
     def _get_datetime_gmt(self, value: str, default: Any = None) -> datetime:
         if value:
-            return datetime.strptime(value, "%b %d, %Y %I:%M:%S %p")
+            return _parse_datetime_gmt(value)
         return default
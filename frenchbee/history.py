@@ -0,0 +1,242 @@
+from dataclasses import dataclass
+from datetime import datetime
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .models import Flight, PassengerInfo
+
+if TYPE_CHECKING:
+    from .watch import WatchTarget
+
+_SCHEMA: Tuple[str, ...] = (
+    "CREATE TABLE IF NOT EXISTS observations ("
+    "route TEXT NOT NULL, passengers TEXT NOT NULL, departure TEXT NOT NULL, "
+    "day TEXT NOT NULL, price REAL NOT NULL, tax REAL, currency TEXT, "
+    "is_offer INTEGER NOT NULL, observed_at INTEGER NOT NULL)",
+    # price of a route on a day over time: one range scan, already in time order
+    "CREATE INDEX IF NOT EXISTS observations_route_day "
+    "ON observations (route, passengers, day, observed_at)",
+    # cheapest per route and month, kept up to date on every flush
+    "CREATE TABLE IF NOT EXISTS monthly_min ("
+    "route TEXT NOT NULL, passengers TEXT NOT NULL, month TEXT NOT NULL, "
+    "day TEXT NOT NULL, price REAL NOT NULL, currency TEXT, "
+    "observed_at INTEGER NOT NULL, PRIMARY KEY (route, passengers, month)) "
+    "WITHOUT ROWID",
+)
+
+_UPSERT_MONTHLY_MIN: str = (
+    "INSERT INTO monthly_min VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (route, passengers, month) DO UPDATE SET "
+    "day = excluded.day, price = excluded.price, currency = excluded.currency, "
+    "observed_at = excluded.observed_at WHERE excluded.price < monthly_min.price"
+)
+
+# route, passengers, departure, day, price, tax, currency, is_offer, observed_at
+_Row = Tuple[str, str, str, str, float, float, str, int, int]
+
+
+@dataclass
+class PricePoint:
+    observed_at: datetime
+    price: float
+    tax: float
+    currency: str
+    is_offer: bool
+    departure: datetime = None  # outbound day, for return calendars
+
+
+@dataclass
+class MonthlyMin:
+    month: str  # YYYY-MM
+    day: datetime
+    price: float
+    currency: str
+    observed_at: datetime
+
+
+class PriceHistory:
+    """
+    Append-only store of every observed calendar price, in a SQLite file.
+
+    Observations are buffered and written in a single transaction once
+    `batch_size` rows are pending or `flush_interval` seconds have passed. Routes
+    are "SOURCE-DESTINATION" in the direction of travel, so return calendars are
+    stored under the reversed route.
+    """
+
+    def __init__(
+        self, path: str, batch_size: int = 5000, flush_interval: float = 60
+    ) -> None:
+        self.path: str = path
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self._flushed_at: float = time.monotonic()
+        self._pending: List[_Row] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._conn: sqlite3.Connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+
+    def __enter__(self) -> "PriceHistory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(
+        self,
+        route: str,
+        passengers: PassengerInfo,
+        flights: Iterable[Flight],
+        departure: datetime = None,
+        observed_at: datetime = None,
+    ) -> None:
+        """Queue one calendar. `departure` is the outbound day of a return calendar."""
+        observed: int = int(observed_at.timestamp() if observed_at else time.time())
+        passengers_str: str = passengers.key
+        departure_str: str = f"{departure:%Y-%m-%d}" if departure else ""
+        rows: List[_Row] = [
+            (
+                route,
+                passengers_str,
+                departure_str,
+                f"{flight.day:%Y-%m-%d}",
+                flight.price,
+                flight.tax,
+                flight.currency,
+                1 if flight.is_offer else 0,
+                observed,
+            )
+            for flight in flights
+            if flight.price is not None
+        ]
+        with self._lock:
+            self._pending.extend(rows)
+            if (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._flushed_at >= self.flush_interval
+            ):
+                self._flush()
+
+    def record_poll(
+        self, target: "WatchTarget", flights: Dict[datetime, Flight]
+    ) -> None:
+        """`PriceWatcher(on_poll=...)` hook."""
+        route: str = (
+            f"{target.destination}-{target.source}"
+            if target.departure
+            else f"{target.source}-{target.destination}"
+        )
+        self.record(
+            route, target.passengers, flights.values(), departure=target.departure
+        )
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._flushed_at = time.monotonic()
+        if not self._pending:
+            return
+        rows: List[_Row] = self._pending
+        self._pending = []
+
+        # reduce the batch to one candidate per month before touching the table
+        minimums: Dict[Tuple[str, str, str], _Row] = {}
+        for row in rows:
+            key: Tuple[str, str, str] = (row[0], row[1], row[3][:7])
+            best: Optional[_Row] = minimums.get(key)
+            if best is None or row[4] < best[4]:
+                minimums[key] = row
+
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(
+                "INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.executemany(
+                _UPSERT_MONTHLY_MIN,
+                [
+                    (route, passengers, month, row[3], row[4], row[6], row[8])
+                    for (route, passengers, month), row in minimums.items()
+                ],
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def price_over_time(
+        self,
+        route: str,
+        day: datetime,
+        passengers: PassengerInfo = None,
+        since: datetime = None,
+    ) -> List[PricePoint]:
+        """Every observed price for `day` on `route`, oldest first."""
+        self.flush()
+        rows = self._conn.execute(
+            "SELECT observed_at, price, tax, currency, is_offer, departure "
+            "FROM observations WHERE route = ? AND passengers = ? AND day = ? "
+            "AND observed_at >= ? ORDER BY observed_at",
+            (
+                route,
+                (passengers or PassengerInfo(Adults=1)).key,
+                f"{day:%Y-%m-%d}",
+                int(since.timestamp()) if since else 0,
+            ),
+        ).fetchall()
+        return [
+            PricePoint(
+                observed_at=datetime.fromtimestamp(observed_at),
+                price=price,
+                tax=tax,
+                currency=currency,
+                is_offer=bool(is_offer),
+                departure=datetime.strptime(departure, "%Y-%m-%d")
+                if departure
+                else None,
+            )
+            for observed_at, price, tax, currency, is_offer, departure in rows
+        ]
+
+    def cheapest_per_month(
+        self, route: str, passengers: PassengerInfo = None
+    ) -> List[MonthlyMin]:
+        """Cheapest price ever observed for each month of travel on `route`."""
+        self.flush()
+        rows = self._conn.execute(
+            "SELECT month, day, price, currency, observed_at FROM monthly_min "
+            "WHERE route = ? AND passengers = ? ORDER BY month",
+            (route, (passengers or PassengerInfo(Adults=1)).key),
+        ).fetchall()
+        return [
+            MonthlyMin(
+                month=month,
+                day=datetime.strptime(day, "%Y-%m-%d"),
+                price=price,
+                currency=currency,
+                observed_at=datetime.fromtimestamp(observed_at),
+            )
+            for month, day, price, currency, observed_at in rows
+        ]
+
+    def routes(self) -> List[str]:
+        self.flush()
+        return [
+            route
+            for (route,) in self._conn.execute(
+                "SELECT DISTINCT route FROM monthly_min ORDER BY route"
+            )
+        ]
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
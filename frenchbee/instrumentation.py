@@ -0,0 +1,187 @@
+"""
+Hooks for timing the stages of a request. `FrenchBee` opens a span around each
+stage (the calendar search, reese84 token, booking form and flight times
+response, segment building) and sets attributes such as byte counts on it. The
+default `Instrumentation` does nothing; `MetricsRecorder` aggregates the spans
+for a Prometheus scrape and `OpenTelemetryTracing` forwards them to a tracer.
+"""
+from dataclasses import dataclass
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN: _NoopSpan = _NoopSpan()
+
+
+class Instrumentation:
+    """
+    Does nothing. `span` returns the same inert span every time, so a disabled
+    stage costs one method call.
+    """
+
+    enabled: bool = False
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        return _NOOP_SPAN
+
+
+NOOP: Instrumentation = Instrumentation()
+
+
+class ByteCounter:
+    """
+    Count the encoded size of the decoded chunks passed through `wrap`, so that
+    several spans reading one stream each get the bytes read while they were open.
+    """
+
+    __slots__ = ("encoding", "pending")
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding: str = encoding
+        self.pending: int = 0
+
+    def wrap(self, chunks: Iterable[str]) -> Iterator[str]:
+        for chunk in chunks:
+            self.pending += len(chunk.encode(self.encoding))
+            yield chunk
+
+    def flush(self, span: Any) -> None:
+        span.set("bytes", self.pending)
+        self.pending = 0
+
+
+@dataclass
+class StageMetrics:
+    calls: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes: int = 0
+
+    def json(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class _RecordedSpan:
+    __slots__ = ("recorder", "name", "bytes", "start")
+
+    def __init__(self, recorder: "MetricsRecorder", name: str) -> None:
+        self.recorder: "MetricsRecorder" = recorder
+        self.name: str = name
+        self.bytes: int = 0
+        self.start: float = 0.0
+
+    def __enter__(self) -> "_RecordedSpan":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        self.recorder._finish(
+            self.name, time.perf_counter() - self.start, self.bytes, exc_type
+        )
+
+    def set(self, key: str, value: Any) -> None:
+        if key == "bytes":
+            self.bytes += value
+
+
+class MetricsRecorder(Instrumentation):
+    """Calls, errors, time and bytes per stage, in process."""
+
+    enabled: bool = True
+
+    def __init__(self, prefix: str = "frenchbee") -> None:
+        self.prefix: str = prefix
+        self._stages: Dict[str, StageMetrics] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def span(self, name: str, **attributes: Any) -> _RecordedSpan:
+        return _RecordedSpan(self, name)
+
+    def _finish(self, name: str, seconds: float, size: int, exc_type: Any) -> None:
+        with self._lock:
+            stage: StageMetrics = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = StageMetrics()
+            stage.calls += 1
+            stage.errors += exc_type is not None
+            stage.seconds += seconds
+            stage.max_seconds = max(stage.max_seconds, seconds)
+            stage.bytes += size
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: stage.json() for name, stage in self._stages.items()}
+
+    def prometheus(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        stages: List[Tuple[str, Dict[str, Any]]] = sorted(self.metrics().items())
+        lines: List[str] = []
+        for metric, kind, field, help_text in (
+            ("stage_calls_total", "counter", "calls", "Stages run."),
+            ("stage_errors_total", "counter", "errors", "Stages that raised."),
+            ("stage_seconds_total", "counter", "seconds", "Time spent per stage."),
+            ("stage_seconds_max", "gauge", "max_seconds", "Slowest run per stage."),
+            ("stage_bytes_total", "counter", "bytes", "Bytes received per stage."),
+        ):
+            name: str = f"{self.prefix}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage, values in stages:
+                lines.append(f'{name}{{stage="{stage}"}} {values[field]}')
+        return "\n".join(lines) + "\n"
+
+
+class _OpenTelemetrySpan:
+    __slots__ = ("context", "span")
+
+    def __init__(self, context: Any) -> None:
+        self.context: Any = context
+        self.span: Any = None
+
+    def __enter__(self) -> "_OpenTelemetrySpan":
+        self.span = self.context.__enter__()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> Any:
+        return self.context.__exit__(*exc_info)
+
+    def set(self, key: str, value: Any) -> None:
+        self.span.set_attribute(f"frenchbee.{key}", value)
+
+
+class OpenTelemetryTracing(Instrumentation):
+    """
+    Report every stage as a span of an OpenTelemetry tracer, e.g.
+    `opentelemetry.trace.get_tracer("frenchbee")`. Spans nest under the caller's
+    current span.
+    """
+
+    enabled: bool = True
+
+    def __init__(self, tracer: Any) -> None:
+        self.tracer: Any = tracer
+
+    def span(self, name: str, **attributes: Any) -> _OpenTelemetrySpan:
+        return _OpenTelemetrySpan(
+            self.tracer.start_as_current_span(
+                f"frenchbee.{name}",
+                attributes={
+                    f"frenchbee.{key}": value for key, value in attributes.items()
+                },
+            )
+        )
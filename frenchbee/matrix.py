@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from datetime import datetime
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import Flight
+
+
+@dataclass
+class PriceMatrix:
+    """
+    Dense grid of round trip prices: `prices[i][j]` is the departure price of
+    `departures[i]` plus the return price of `returns[j]`, or None when that pair
+    is not bookable.
+    """
+
+    departures: List[datetime]
+    returns: List[datetime]
+    prices: List[List[Optional[float]]]
+    departure_flights: Dict[datetime, Flight]
+    return_flights: Dict[datetime, Dict[datetime, Flight]]
+
+    @classmethod
+    def from_calendars(
+        cls,
+        departure_flights: Dict[datetime, Flight],
+        return_flights: Dict[datetime, Dict[datetime, Flight]],
+    ) -> "PriceMatrix":
+        departures: List[datetime] = sorted(return_flights)
+        returns: List[datetime] = sorted(
+            {day for flights in return_flights.values() for day in flights}
+        )
+        prices: List[List[Optional[float]]] = []
+        for departure in departures:
+            outbound: float = departure_flights[departure].price
+            inbound: Dict[datetime, Flight] = return_flights[departure]
+            prices.append(
+                [
+                    outbound + inbound[day].price if day in inbound else None
+                    for day in returns
+                ]
+            )
+        return cls(departures, returns, prices, departure_flights, return_flights)
+
+    def price(self, departure: datetime, returns: datetime) -> Optional[float]:
+        inbound: Dict[datetime, Flight] = self.return_flights.get(departure) or {}
+        if returns not in inbound:
+            return None
+        return self.departure_flights[departure].price + inbound[returns].price
+
+    def pairs(
+        self, min_stay: int = None, max_stay: int = None
+    ) -> Iterable[Tuple[datetime, datetime, float]]:
+        for i, departure in enumerate(self.departures):
+            for j, returns in enumerate(self.returns):
+                total: Optional[float] = self.prices[i][j]
+                if total is None:
+                    continue
+                stay: int = (returns - departure).days
+                if min_stay is not None and stay < min_stay:
+                    continue
+                if max_stay is not None and stay > max_stay:
+                    continue
+                yield (departure, returns, total)
+
+    def cheapest(
+        self, count: int = 1, min_stay: int = None, max_stay: int = None
+    ) -> List[Tuple[datetime, datetime, float]]:
+        """Cheapest `count` (departure, return, total) pairs, stay length in nights."""
+        return heapq.nsmallest(
+            count, self.pairs(min_stay, max_stay), key=lambda pair: pair[2]
+        )
@@ -1,6 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Type, TypeVar
+
+T = TypeVar("T")
 
 
 def minimize_dict(maximized: Dict[Any, Any]) -> Dict[Any, Any]:
@@ -23,16 +25,65 @@ def serialize_datetimes(dic: Dict[str, Any]) -> Dict[str, Any]:
     return output
 
 
+def slotted(cls: Type[T]) -> Type[T]:
+    """Rebuild a dataclass with `__slots__`, dropping the per-instance `__dict__`."""
+    names: tuple = tuple(field.name for field in fields(cls))
+    body: Dict[str, Any] = {
+        key: value
+        for key, value in cls.__dict__.items()
+        if key not in names and key not in ("__dict__", "__weakref__")
+    }
+    body["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, body)
+
+
+def as_dict(obj: Any) -> Dict[str, Any]:
+    return {field.name: getattr(obj, field.name) for field in fields(obj)}
+
+
 @dataclass
 class PassengerInfo:
     Adults: int
     Children: int = 0
     Infants: int = 0
 
+    @property
+    def key(self) -> str:
+        """The passenger mix as adults-children-infants, e.g. `2-1-0`."""
+        return f"{self.Adults}-{self.Children}-{self.Infants}"
+
+    @classmethod
+    def from_key(cls, key: str) -> "PassengerInfo":
+        return cls(*map(int, key.split("-")))
+
     def json(self) -> Dict[str, Any]:
         return minimize_dict(self.__dict__)
 
 
+@dataclass(frozen=True)
+class Market:
+    """The French Bee site prices are asked from, e.g. `fr.frenchbee.com` in `fr`."""
+
+    site_origin: str = "us.frenchbee.com"
+    lang: str = "en"
+
+    @property
+    def key(self) -> str:
+        return f"{self.site_origin}/{self.lang}"
+
+    @property
+    def search_url(self) -> str:
+        return f"https://{self.site_origin}/{self.lang}?ajax_form=1"
+
+    @property
+    def cookies(self) -> Dict[str, str]:
+        return {"site_origin": self.site_origin, "market_lang": self.lang}
+
+    def json(self) -> Dict[str, Any]:
+        return minimize_dict(as_dict(self))
+
+
+@slotted
 @dataclass
 class Location:
     code: str
@@ -41,9 +92,10 @@ class Location:
     transport: str = None
 
     def json(self) -> Dict[str, Any]:
-        return minimize_dict(self.__dict__)
+        return minimize_dict(as_dict(self))
 
 
+@slotted
 @dataclass
 class Flight:
     arrival_airport: str
@@ -55,20 +107,22 @@ class Flight:
     tax: float
 
     def json(self) -> Dict[str, Any]:
-        return serialize_datetimes(minimize_dict(self.__dict__))
+        return serialize_datetimes(minimize_dict(as_dict(self)))
 
 
+@slotted
 @dataclass
 class DateAndLocation:
     date: datetime
     location: Location
 
     def json(self) -> Dict[str, Any]:
-        value: Dict[str, Any] = dict(self.__dict__)
+        value: Dict[str, Any] = as_dict(self)
         value["location"] = self.location.json()
         return serialize_datetimes(minimize_dict(value))
 
 
+@slotted
 @dataclass
 class Segment:
     airline_code: str
@@ -79,7 +133,7 @@ class Segment:
     end: DateAndLocation
 
     def json(self) -> Dict[str, Any]:
-        value: Dict[str, Any] = dict(self.__dict__)
+        value: Dict[str, Any] = as_dict(self)
         value["start"] = self.start.json()
         value["end"] = self.end.json()
         return minimize_dict(value)
@@ -108,3 +162,32 @@ class Trip:
                 [k.json() for k in j] for j in self.destination_segments
             ]
         return minimize_dict(value)
+
+
+@dataclass
+class CalendarTarget:
+    """
+    One calendar: the departure calendar of a route, or the return calendar for
+    a given departure day when `departure` is set.
+    """
+
+    source: str
+    destination: str
+    passengers: PassengerInfo
+    departure: datetime = None
+
+    @property
+    def key(self) -> str:
+        departure: str = f"{self.departure:%Y-%m-%d}" if self.departure else "-"
+        return f"{self.source}-{self.destination}|{self.passengers.key}|{departure}"
+
+    def trip(self) -> Trip:
+        return Trip(
+            origin_depart=DateAndLocation(
+                date=self.departure, location=Location(self.source)
+            ),
+            destination_return=DateAndLocation(
+                date=None, location=Location(self.destination)
+            ),
+            passengers=self.passengers,
+        )
@@ -0,0 +1,52 @@
+from functools import lru_cache
+import re
+from typing import Any, List, Tuple
+
+_DOTTED_PATH_RE: re.Pattern = re.compile(r"^\$(\.[A-Za-z_][A-Za-z0-9_]*)+$")
+
+
+class DottedPath:
+    """Plain `$.a.b.c` paths, resolved by walking nested dicts."""
+
+    __slots__ = ("keys",)
+
+    def __init__(self, path: str) -> None:
+        self.keys: Tuple[str, ...] = tuple(path.split(".")[1:])
+
+    def find(self, json_object: Any) -> List[Any]:
+        value: Any = json_object
+        for key in self.keys:
+            if not isinstance(value, dict) or key not in value:
+                return []
+            value = value[key]
+        return [value]
+
+
+class JsonPath:
+    """Any other path, parsed once with jsonpath_ng."""
+
+    __slots__ = ("expression",)
+
+    def __init__(self, path: str) -> None:
+        import jsonpath_ng  # building the PLY parser is slow, only pay for it here
+
+        self.expression = jsonpath_ng.parse(path)
+
+    def find(self, json_object: Any) -> List[Any]:
+        return [match.value for match in self.expression.find(json_object)]
+
+
+@lru_cache(maxsize=None)
+def compile_path(path: str) -> Any:
+    if _DOTTED_PATH_RE.match(path):
+        return DottedPath(path)
+    return JsonPath(path)
+
+
+def get_json_path(json_object: Any, path: str, default: Any = None) -> Any:
+    matches: List[Any] = compile_path(path).find(json_object)
+    if matches:
+        if len(matches) == 1:
+            return matches[0]
+        return matches
+    return default
@@ -0,0 +1,221 @@
+from dataclasses import dataclass, field
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .errors import CircuitOpenError
+
+
+class TokenBucket:
+    """Allow `rate` acquisitions per second on average, in bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate: float = rate
+        self.burst: float = float(burst)
+        self._tokens: float = float(burst)
+        self._updated: float = time.monotonic()
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns the time waited."""
+        waited: float = 0.0
+        while True:
+            with self._lock:
+                now: float = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay: float = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit: every success raises the limit by `1 / limit` (about
+    +1 per round of requests) and every throttled or failed request multiplies it
+    by `backoff`, never going below `minimum` or above `maximum`.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 32,
+        backoff: float = 0.5,
+    ) -> None:
+        self.limit: float = float(initial)
+        self.minimum: int = minimum
+        self.maximum: int = maximum
+        self.backoff: float = backoff
+        self.in_flight: int = 0
+        self._condition: threading.Condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, success: bool) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            if success:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            else:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+            self._condition.notify_all()
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests to a host after `threshold` consecutive failures. After
+    `reset_timeout` seconds one trial request is let through: its success closes
+    the circuit again, its failure re-opens it.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 60) -> None:
+        self.threshold: int = threshold
+        self.reset_timeout: float = reset_timeout
+        self.failures: int = 0
+        self.opened_at: Optional[float] = None
+        self._trial: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_request(self, host: str) -> None:
+        with self._lock:
+            state: str = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return
+            raise CircuitOpenError(
+                f"Circuit for {host} is open after repeated failures."
+            )
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            self._trial = False
+            if success:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+@dataclass
+class RetryPolicy:
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    retry_statuses: tuple = (429, 500, 502, 503, 504)
+    # read timeouts and server errors are only retried for these: a POST that
+    # timed out or failed may have been served, e.g. the booking form with its
+    # one-shot EXTERNAL_ID
+    idempotent_methods: tuple = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full jitter exponential backoff, or the server's Retry-After if longer."""
+        backoff: float = random.uniform(
+            0, min(self.max_delay, self.base_delay * 2**attempt)
+        )
+        if retry_after is not None:
+            return min(self.max_delay, max(backoff, retry_after))
+        return backoff
+
+
+@dataclass
+class HostMetrics:
+    requests: int = 0
+    successes: int = 0
+    throttled: int = 0
+    blocked: int = 0
+    server_errors: int = 0
+    connection_errors: int = 0
+    retries: int = 0
+    rejected: int = 0
+    rate_limit_wait: float = 0.0
+
+    def json(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+@dataclass
+class HostPolicy:
+    bucket: TokenBucket = None
+    concurrency: AdaptiveConcurrency = None
+    breaker: CircuitBreaker = None
+    metrics: HostMetrics = field(default_factory=HostMetrics)
+
+
+def default_policies(share: float = 1.0) -> Dict[str, Callable[[], HostPolicy]]:
+    """`share` scales the request rates, e.g. 1 / N for each of N processes."""
+    return {
+        "us.frenchbee.com": lambda: HostPolicy(
+            bucket=TokenBucket(rate=10 * share, burst=max(1, int(20 * share))),
+            concurrency=AdaptiveConcurrency(initial=8, maximum=32),
+        ),
+        "vols.frenchbee.com": lambda: HostPolicy(
+            bucket=TokenBucket(rate=2 * share, burst=max(1, int(4 * share))),
+            concurrency=AdaptiveConcurrency(initial=2, maximum=8),
+            breaker=CircuitBreaker(threshold=5, reset_timeout=60),
+        ),
+    }
+
+
+class RateLimiter:
+    """Per-host token buckets, adaptive concurrency limits and circuit breakers."""
+
+    def __init__(
+        self,
+        policies: Dict[str, Callable[[], HostPolicy]] = None,
+        default: Callable[[], HostPolicy] = HostPolicy,
+    ) -> None:
+        self._factories: Dict[str, Callable[[], HostPolicy]] = (
+            default_policies() if policies is None else policies
+        )
+        self._default: Callable[[], HostPolicy] = default
+        self._policies: Dict[str, HostPolicy] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def policy(self, host: str) -> HostPolicy:
+        policy: HostPolicy = self._policies.get(host)
+        if policy is None:
+            with self._lock:
+                policy = self._policies.get(host)
+                if policy is None:
+                    policy = self._factories.get(host, self._default)()
+                    self._policies[host] = policy
+        return policy
+
+    def register(self, host: str, like: str) -> None:
+        """Give `host` its own policy built like the one of `like`."""
+        with self._lock:
+            self._factories.setdefault(host, self._factories.get(like, self._default))
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        output: Dict[str, Dict[str, Any]] = {}
+        for host, policy in list(self._policies.items()):
+            output[host] = policy.metrics.json()
+            if policy.concurrency:
+                output[host]["concurrency_limit"] = policy.concurrency.limit
+                output[host]["in_flight"] = policy.concurrency.in_flight
+            if policy.breaker:
+                output[host]["circuit"] = policy.breaker.state
+        return output
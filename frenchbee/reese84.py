@@ -1,7 +1,13 @@
+from dataclasses import dataclass
 import json
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Dict, Optional
 from requests import Response, Session
 
+from .errors import UnexpectedResponseError
+from .transport import Transport, raise_for_status
+
 
 class FrenchBeeReese84:
     """
@@ -9,20 +15,29 @@ class FrenchBeeReese84:
     #infosec I stumbled upon a interesting....security product on the web recently...one of those that make you want to drink...
     """
 
-    def __init__(self) -> None:
-        self.session = Session()
-        self.session.headers = {
+    def __init__(self, transport: Transport = None) -> None:
+        self.transport: Transport = transport or Transport()
+        self.session: Session = self.transport.session
+        self.headers: Dict[str, str] = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.88 Safari/537.36",
             "Content-type": "text/plain; charset=utf-8",
-            "Cookie": "base_host=frenchbee.com; market_lang=en; site_origin=us.frenchbee.com",
         }
 
     def token(self) -> str:
+        return self.fetch().get("token")
+
+    def fetch(self) -> Dict[str, Any]:
         url: str = "https://vols.frenchbee.com/Both-Who-what-it-vs-euen-auoid-to-got-fly-ith-Pr?d=vols.frenchbee.com"
         payload: str = json.dumps(self._get_payload(), separators=(",", ":"))
-        resp: Response = self.session.post(url, data=payload)
-        result: Dict[str, Any] = resp.json()
-        return result.get("token")
+        resp: Response = raise_for_status(
+            self.session.post(url, data=payload, headers=self.headers)
+        )
+        try:
+            return resp.json()
+        except ValueError as ex:
+            raise UnexpectedResponseError(
+                "The reese84 endpoint did not answer with JSON."
+            ) from ex
 
     def _get_payload(self) -> Dict[str, str]:
         return {
@@ -39,3 +54,130 @@ class FrenchBeeReese84:
             "error": None,
             "performance": {"ac": 1, "total": 119, "interrogation": 110945},
         }
+
+
+@dataclass
+class TokenMetrics:
+    refreshes: int = 0
+    failures: int = 0
+    waits: int = 0
+    last_refresh_latency: float = None
+    total_refresh_latency: float = 0.0
+    issued_at: float = None
+    expires_at: float = None
+
+    @property
+    def token_age(self) -> Optional[float]:
+        return time.time() - self.issued_at if self.issued_at else None
+
+    def json(self) -> Dict[str, Any]:
+        value: Dict[str, Any] = dict(self.__dict__)
+        value["token_age"] = self.token_age
+        return value
+
+
+class Reese84TokenManager:
+    """
+    Hands out one reese84 token to every caller until it is about to expire.
+    The token is renewed `refresh_margin` seconds ahead of its expiry on a
+    background thread, and only one thread ever fetches at a time: callers that
+    find no usable token wait for the in-flight fetch instead of starting another.
+    After a failed fetch, background renewals wait `retry_delay` seconds.
+    """
+
+    def __init__(
+        self,
+        client: FrenchBeeReese84 = None,
+        default_ttl: float = 300,
+        refresh_margin: float = 60,
+        retry_delay: float = 10,
+    ) -> None:
+        self.client: FrenchBeeReese84 = client or FrenchBeeReese84()
+        self.default_ttl: float = default_ttl
+        self.refresh_margin: float = refresh_margin
+        self.retry_delay: float = retry_delay
+        self.metrics: TokenMetrics = TokenMetrics()
+        self._token: str = None
+        self._expires_at: float = 0.0
+        self._refreshing: bool = False
+        self._retry_at: float = 0.0  # no background refresh before, after a failure
+        self._error: Exception = None
+        self._condition: threading.Condition = threading.Condition()
+
+    def token(self) -> str:
+        with self._condition:
+            now: float = time.time()
+            if self._token and now < self._expires_at:
+                if now >= max(self._expires_at - self.refresh_margin, self._retry_at):
+                    self._start_refresh(background=True)
+                return self._token
+
+            if not self._refreshing:
+                self._start_refresh(background=False)
+            else:
+                self.metrics.waits += 1
+            while self._refreshing:
+                self._condition.wait()
+            if not self._token or time.time() >= self._expires_at:
+                raise RuntimeError("Unable to get a reese84 token.") from self._error
+            return self._token
+
+    def prefetch(self) -> None:
+        """Start fetching a token in the background if `token` would have to wait."""
+        with self._condition:
+            now: float = time.time()
+            if (not self._token or now >= self._expires_at) and now >= self._retry_at:
+                self._start_refresh(background=True)
+
+    def invalidate(self) -> None:
+        with self._condition:
+            self._expires_at = 0.0
+
+    def _start_refresh(self, background: bool) -> None:
+        # called with the condition held
+        if self._refreshing:
+            return
+        self._refreshing = True
+        if background:
+            threading.Thread(
+                target=self._refresh, name="reese84-refresh", daemon=True
+            ).start()
+        else:
+            self._condition.release()
+            try:
+                self._refresh()
+            finally:
+                self._condition.acquire()
+
+    def _refresh(self) -> None:
+        started: float = time.time()
+        token: str = None
+        ttl: float = self.default_ttl
+        error: Exception = None
+        try:
+            result: Dict[str, Any] = self.client.fetch()
+            token = result.get("token")
+            ttl = float(result.get("renewInSec") or self.default_ttl)
+            if not token:
+                raise ValueError(f"reese84 response has no token: {result}")
+        except Exception as ex:
+            error = ex
+
+        finished: float = time.time()
+        with self._condition:
+            self._refreshing = False
+            self._error = error
+            latency: float = finished - started
+            self.metrics.last_refresh_latency = latency
+            self.metrics.total_refresh_latency += latency
+            if error is None:
+                self._token = token
+                self._expires_at = finished + ttl
+                self.metrics.refreshes += 1
+                self.metrics.issued_at = finished
+                self.metrics.expires_at = self._expires_at
+                self._retry_at = 0.0
+            else:
+                self.metrics.failures += 1
+                self._retry_at = finished + self.retry_delay
+            self._condition.notify_all()
@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import heapq
+from typing import List, Tuple
+
+from .calendars import FlightCalendar
+from .frenchbee import FrenchBee
+from .models import DateAndLocation, Flight, Location, PassengerInfo, Trip
+
+
+@dataclass
+class RoundTrip:
+    departure: Flight
+    returns: Flight
+    total: float
+
+    @property
+    def nights(self) -> int:
+        return (self.returns.day - self.departure.day).days
+
+
+@dataclass
+class SearchResult:
+    trips: List[RoundTrip] = field(default_factory=list)  # cheapest first
+    requests: int = 0  # calendars fetched
+    departures_searched: int = 0
+    departures_pruned: int = 0
+
+
+def search_round_trips(
+    client: FrenchBee,
+    source: str,
+    destination: str,
+    start: datetime,
+    end: datetime,
+    min_nights: int,
+    max_nights: int,
+    passengers: PassengerInfo = None,
+    count: int = 5,
+    return_floor: float = 0.0,
+    max_requests: int = None,
+) -> SearchResult:
+    """
+    Cheapest `count` round trips leaving between `start` and `end` (inclusive)
+    and staying `min_nights` to `max_nights` nights.
+
+    Departures are tried cheapest first, fetching one return calendar each, and
+    the search stops once a departure's price plus `return_floor` exceeds the
+    `count`-th best total found. Equal totals are ranked by the earlier dates.
+    `return_floor` must not exceed the cheapest return price, or results may be
+    missed: 0 is always safe, and a known low (e.g. from a `PriceHistory`) prunes
+    more. `max_requests` caps the calendars fetched, the departure calendar
+    included.
+    """
+    result: SearchResult = SearchResult()
+    trip: Trip = Trip(
+        origin_depart=DateAndLocation(date=None, location=Location(source)),
+        destination_return=DateAndLocation(date=None, location=Location(destination)),
+        passengers=passengers or PassengerInfo(Adults=1),
+    )
+    calendar: FlightCalendar = client.get_departure_calendar(trip)
+    result.requests += 1
+    if not calendar:
+        return result
+    calendar = calendar.between(start, end)
+
+    candidates: List[Tuple[float, int]] = sorted(
+        (price, idx) for idx, price in enumerate(calendar.prices)
+    )
+    # max-heap of the best `count` trips by (total, departure day, return day), so
+    # equal totals are ranked the same whatever order the departures are tried in
+    best: List[Tuple[float, int, int, RoundTrip]] = []
+    for position, (price, idx) in enumerate(candidates):
+        bound: float = price + return_floor
+        if len(best) >= count and bound > -best[0][0]:
+            result.departures_pruned = len(candidates) - position
+            break
+        if max_requests is not None and result.requests >= max_requests:
+            result.departures_pruned = len(candidates) - position
+            break
+
+        departure: Flight = calendar.flight(idx)
+        trip.origin_depart.date = departure.day
+        returns: FlightCalendar = client.get_return_calendar(trip)
+        result.requests += 1
+        result.departures_searched += 1
+        if not returns:
+            continue
+        returns = returns.between(
+            departure.day + timedelta(days=min_nights),
+            departure.day + timedelta(days=max_nights),
+        )
+        for return_idx, return_price in enumerate(returns.prices):
+            total: float = price + return_price
+            if len(best) >= count and total > -best[0][0]:
+                continue
+            return_flight: Flight = returns.flight(return_idx)
+            entry: Tuple[float, int, int, RoundTrip] = (
+                -total,
+                -departure.day.toordinal(),
+                -return_flight.day.toordinal(),
+                RoundTrip(departure, return_flight, total),
+            )
+            if len(best) < count:
+                heapq.heappush(best, entry)
+            elif entry[:3] > best[0][:3]:
+                heapq.heapreplace(best, entry)
+
+    best.sort(key=lambda entry: entry[:3], reverse=True)
+    result.trips = [entry[3] for entry in best]
+    return result
@@ -0,0 +1,117 @@
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from functools import lru_cache
+import json
+from typing import Any, Callable, Dict, IO, Iterable, List, Tuple, Type
+
+from .calendars import FlightCalendar
+
+
+@lru_cache(maxsize=4096)
+def _format_datetime(value: datetime) -> str:
+    if value.hour != 0 or value.minute != 0 or value.second != 0:
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value.strftime("%Y-%m-%d")
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _convert_list(value: Any) -> List[Any]:
+    return [to_primitive(item) for item in value]
+
+
+def _convert_dict(value: Dict[Any, Any]) -> Dict[Any, Any]:
+    return {key: to_primitive(item) for key, item in value.items()}
+
+
+def _convert_calendar(value: FlightCalendar) -> List[Dict[str, Any]]:
+    return [to_primitive(value.flight(idx)) for idx in range(len(value))]
+
+
+def _dataclass_converter(cls: Type) -> Callable[[Any], Dict[str, Any]]:
+    names: Tuple[str, ...] = tuple(field.name for field in fields(cls))
+
+    def convert(value: Any) -> Dict[str, Any]:
+        output: Dict[str, Any] = {}
+        for name in names:
+            item: Any = getattr(value, name)
+            if item is not None and item != "":
+                output[name] = to_primitive(item)
+        return output
+
+    return convert
+
+
+_CONVERTERS: Dict[Type, Callable[[Any], Any]] = {
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    type(None): _identity,
+    datetime: _format_datetime,
+    list: _convert_list,
+    tuple: _convert_list,
+    dict: _convert_dict,
+    FlightCalendar: _convert_calendar,
+}
+
+
+def to_primitive(value: Any) -> Any:
+    """
+    Convert models to plain dicts/lists in one pass, with the same shape as their
+    `json()` methods: empty fields dropped and datetimes formatted as strings.
+    """
+    convert: Callable[[Any], Any] = _CONVERTERS.get(type(value))
+    if convert is None:
+        if is_dataclass(value):
+            convert = _dataclass_converter(type(value))
+        elif isinstance(value, datetime):
+            convert = _format_datetime
+        elif isinstance(value, (list, tuple)):
+            convert = _convert_list
+        elif isinstance(value, dict):
+            convert = _convert_dict
+        else:
+            return value
+        _CONVERTERS[type(value)] = convert
+    return convert(value)
+
+
+def _get_dumps(backend: str) -> Callable[[Any], str]:
+    if backend in (None, "orjson"):
+        try:
+            import orjson
+
+            return lambda value: orjson.dumps(value).decode()
+        except ImportError:
+            if backend == "orjson":
+                raise
+    return lambda value: json.dumps(value, separators=(",", ":"))
+
+
+class JsonLinesWriter:
+    """
+    Write models as JSON Lines to a text stream. `backend` is "orjson", "json" or
+    None to use orjson when it is installed.
+    """
+
+    def __init__(self, stream: IO[str], backend: str = None) -> None:
+        self.stream: IO[str] = stream
+        self._dumps: Callable[[Any], str] = _get_dumps(backend)
+
+    def write(self, value: Any) -> None:
+        self.stream.write(self._dumps(to_primitive(value)))
+        self.stream.write("\n")
+
+    def write_all(self, values: Iterable[Any]) -> None:
+        for value in values:
+            self.write(value)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def dumps(value: Any, backend: str = None) -> str:
+    return _get_dumps(backend)(to_primitive(value))
@@ -0,0 +1,100 @@
+"""
+`frenchbee-cli serve` keeps one interpreter warm and answers CLI calls sent over
+a Unix socket, so scripted jobs skip the import and connection setup of every
+call. A call is one JSON line `{"argv": [...]}` and its answer one JSON line
+`{"exit": code, "stdout": ..., "stderr": ...}`. Calls are answered one at a time.
+"""
+from contextlib import redirect_stderr, redirect_stdout
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import traceback
+from typing import Any, Callable, Dict, IO, List, Optional
+
+# these never finish, or stream output, so they are run locally
+LOCAL_COMMANDS: List[str] = ["serve", "sweep", "watch"]
+
+
+def default_socket_path() -> str:
+    runtime_dir: str = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "frenchbee"
+    )
+    return os.path.join(runtime_dir, "frenchbee-cli.sock")
+
+
+def _exit_code(ex: SystemExit) -> int:
+    if ex.code is None:
+        return 0
+    return ex.code if isinstance(ex.code, int) else 1
+
+
+class _CallHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        request: Dict[str, Any] = json.loads(self.rfile.readline())
+        argv: List[str] = request["argv"]
+        stdout: io.StringIO = io.StringIO()
+        stderr: io.StringIO = io.StringIO()
+        code: int = 0
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                code = self.server.main(argv, local=True) or 0
+            except SystemExit as ex:  # argparse errors and --help
+                code = _exit_code(ex)
+            except Exception:
+                traceback.print_exc()
+                code = 1
+        response: Dict[str, Any] = {
+            "exit": code,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class CliServer(socketserver.UnixStreamServer):
+    def __init__(self, path: str, main: Callable[..., int]) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(path)  # left over from a server that did not shut down
+        super().__init__(path, _CallHandler)
+        self.path: str = path
+        self.main: Callable[..., int] = main  # called as main(argv, local=True)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def serve(path: str, main: Callable[..., int]) -> None:
+    with CliServer(path, main) as server:
+        server.serve_forever()
+
+
+def forward(
+    path: str,
+    argv: List[str],
+    stdout: IO[str] = None,
+    stderr: IO[str] = None,
+) -> Optional[int]:
+    """
+    Run `argv` on the server at `path` and copy its output. Returns its exit code,
+    or None when the call should run locally because no server is listening.
+    """
+    if argv[:1] and argv[0] in LOCAL_COMMANDS or not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        conn: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(path)
+    except OSError:
+        return None
+    with conn:
+        conn.sendall(json.dumps({"argv": argv}).encode("utf-8") + b"\n")
+        with conn.makefile("rb") as reader:
+            response: Dict[str, Any] = json.loads(reader.readline())
+    (stdout or sys.stdout).write(response["stdout"])
+    (stderr or sys.stderr).write(response["stderr"])
+    return response["exit"]
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+import threading
+from typing import Any, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    executed: int = 0
+    coalesced: int = 0
+
+    def json(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done: threading.Event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls that share a key into one: the first caller runs
+    the function and every caller that arrives before it finishes gets the same
+    result (or exception). Nothing is kept once the call completes.
+    """
+
+    def __init__(self) -> None:
+        self.stats: SingleFlightStats = SingleFlightStats()
+        self._lock: threading.Lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        with self._lock:
+            self.stats.calls += 1
+            call: _Call = self._calls.get(key)
+            leader: bool = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats.executed += 1
+            else:
+                self.stats.coalesced += 1
+
+        if leader:
+            try:
+                call.result = func()
+            except BaseException as ex:
+                call.error = ex
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
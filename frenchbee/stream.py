@@ -0,0 +1,141 @@
+import json
+import re
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+_TOKEN_RE: re.Pattern = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|"|[\[\]{}]')
+_PATH_TOKEN_RE: re.Pattern = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|"|[\[\]{}:,]')
+_ARRAY: object = object()
+
+PROPOSED_BOUNDS_PATH: Tuple[str, ...] = (
+    "pageDefinitionConfig",
+    "pageData",
+    "business",
+    "Availability",
+    "proposedBounds",
+)
+
+
+class _ChunkReader:
+    def __init__(self, chunks: Iterable[str]) -> None:
+        self._chunks: Iterator[str] = iter(chunks)
+        self.buffer: str = ""
+
+    def read(self) -> bool:
+        for chunk in self._chunks:
+            if chunk:
+                self.buffer += chunk
+                return True
+        return False
+
+    def skip_past(self, marker: str) -> None:
+        while True:
+            idx: int = self.buffer.find(marker)
+            if idx >= 0:
+                self.buffer = self.buffer[idx + len(marker) :]
+                return
+            # keep enough of the tail to match a marker split across chunks
+            self.buffer = self.buffer[-(len(marker) - 1) :] if len(marker) > 1 else ""
+            if not self.read():
+                raise ValueError(f"{marker} not found in response.")
+
+    def skip_to_array(self, path: Sequence[str]) -> None:
+        """
+        Skip past the opening bracket of the array found at `path`, a list of
+        object keys from the next JSON object in the buffer.
+        """
+        self.skip_past("{")
+        keys: List[Any] = [None]  # key being read at each open object, or _ARRAY
+        target: List[str] = list(path)
+        pos: int = 0
+        name: str = None  # the last string, a key if a colon follows
+        while True:
+            match: re.Match = _PATH_TOKEN_RE.search(self.buffer, pos)
+            token: str = match.group() if match else None
+            if token is None or token == '"':
+                # keep a string that continues in the next chunk
+                self.buffer = self.buffer[match.start() :] if token else ""
+                pos = 0
+                if not self.read():
+                    raise ValueError(f"{'.'.join(path)} not found in response.")
+                continue
+
+            pos = match.end()
+            if token[0] == '"':
+                name = token
+            elif token == ":":
+                if keys[-1] is not _ARRAY:
+                    keys[-1] = json.loads(name)
+            elif token == ",":
+                if keys[-1] is not _ARRAY:
+                    keys[-1] = None
+            elif token == "[" and keys == target:
+                self.buffer = self.buffer[pos:]
+                return
+            elif token in "[{":
+                keys.append(_ARRAY if token == "[" else None)
+            else:
+                keys.pop()
+                if not keys:  # the object closed without the array
+                    raise ValueError(f"{'.'.join(path)} not found in response.")
+
+
+def iter_json_array(
+    chunks: Iterable[str], markers: Sequence[str], path: Sequence[str]
+) -> Iterator[Any]:
+    """
+    Yield the items of the JSON array at `path`, a list of object keys from the
+    first object after each of `markers` in turn, while reading `chunks` of text.
+    Arrays under the same key elsewhere are skipped. Only the item being parsed
+    is kept in memory; items must be objects or arrays.
+    """
+    reader: _ChunkReader = _ChunkReader(chunks)
+    for marker in markers:
+        reader.skip_past(marker)
+    reader.skip_to_array(path)
+
+    pos: int = 0
+    depth: int = 0
+    item_start: int = 0
+    while True:
+        match: re.Match = _TOKEN_RE.search(reader.buffer, pos)
+        token: str = match.group() if match else None
+        if token is None or token == '"':
+            # nothing left in the buffer, or a string that continues in the next chunk
+            if depth == 0:
+                reader.buffer = ""
+                pos = 0
+            elif token == '"':
+                pos = match.start()
+            else:
+                pos = len(reader.buffer)
+            if not reader.read():
+                raise ValueError(f"{path[-1]} is not terminated in response.")
+            continue
+
+        pos = match.end()
+        if token[0] == '"':
+            continue
+        if token in "[{":
+            if depth == 0:
+                item_start = match.start()
+            depth += 1
+            continue
+        if depth == 0:  # closing bracket of the array itself
+            return
+        depth -= 1
+        if depth == 0:
+            yield json.loads(reader.buffer[item_start:pos])
+            reader.buffer = reader.buffer[pos:]
+            pos = 0
+
+
+def iter_proposed_bounds(chunks: Iterable[str]) -> Iterator[Any]:
+    return iter_json_array(
+        chunks,
+        markers=("PlnextPageProvider.init(", "config"),
+        path=PROPOSED_BOUNDS_PATH,
+    )
+
+
+def get_proposed_bounds(chunks: Iterable[str]) -> List[Any]:
+    return list(iter_proposed_bounds(chunks))
@@ -0,0 +1,159 @@
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+import json
+import os
+from typing import Callable, Iterable, Iterator, List, Set, Tuple
+
+from .calendars import FlightCalendar
+from .frenchbee import FrenchBee
+from .models import CalendarTarget, PassengerInfo, Trip
+from .ratelimit import RateLimiter, default_policies
+from .transport import DEFAULT_POOL_SIZES, Transport
+
+
+@dataclass
+class WorkUnit(CalendarTarget):
+    """One calendar to fetch."""
+
+
+@dataclass
+class SweepResult:
+    unit: WorkUnit
+    calendar: FlightCalendar = None
+    error: str = None
+
+
+def plan(
+    routes: Iterable[Tuple[str, str]],
+    passengers: Iterable[PassengerInfo],
+    departures: Iterable[datetime] = (),
+) -> Iterator[WorkUnit]:
+    """Every route x passenger mix, with one return calendar per departure day."""
+    mixes: List[PassengerInfo] = list(passengers)
+    days: List[datetime] = list(departures)
+    for source, destination in routes:
+        for mix in mixes:
+            yield WorkUnit(source, destination, mix)
+            for day in days:
+                yield WorkUnit(source, destination, mix, departure=day)
+
+
+# per process state, set up once by _init_worker
+_client: FrenchBee = None
+_executor: ThreadPoolExecutor = None
+
+
+def _init_worker(
+    concurrency: int,
+    share: float,
+    client_factory: Callable[[Transport], FrenchBee],
+) -> None:
+    global _client, _executor
+    transport: Transport = Transport(
+        pool_sizes={host: concurrency for host in DEFAULT_POOL_SIZES},
+        default_pool_size=concurrency,
+        limiter=RateLimiter(default_policies(share)),
+    )
+    _client = (
+        client_factory(transport) if client_factory else FrenchBee(transport=transport)
+    )
+    _executor = ThreadPoolExecutor(concurrency, thread_name_prefix="frenchbee")
+
+
+def _fetch(unit: WorkUnit) -> SweepResult:
+    try:
+        trip: Trip = unit.trip()
+        calendar: FlightCalendar = (
+            _client.get_return_calendar(trip)
+            if unit.departure
+            else _client.get_departure_calendar(trip)
+        )
+        return SweepResult(unit, calendar)
+    except Exception as ex:
+        return SweepResult(unit, error=repr(ex))
+
+
+def _run_chunk(units: List[WorkUnit]) -> List[SweepResult]:
+    return list(_executor.map(_fetch, units))
+
+
+class Sweep:
+    """
+    Fetch many calendars on a pool of processes, each running `concurrency`
+    requests at a time on its own threads, so that response parsing is spread
+    over every core. Results are yielded as their chunk completes, not in order.
+
+    With a `checkpoint` file, the keys of finished units are appended to it and
+    units already listed there are skipped, so an interrupted sweep resumes where
+    it stopped. Failed units are not checkpointed and are tried again.
+
+    Request rates are split evenly between the processes, so the whole sweep
+    stays within the default per-host limits.
+    """
+
+    def __init__(
+        self,
+        units: Iterable[WorkUnit],
+        processes: int = None,
+        concurrency: int = 8,
+        chunk_size: int = 16,
+        checkpoint: str = None,
+        client_factory: Callable[[Transport], FrenchBee] = None,
+    ) -> None:
+        self.units: Iterable[WorkUnit] = units
+        self.processes: int = processes or os.cpu_count() or 1
+        self.concurrency: int = concurrency
+        self.chunk_size: int = chunk_size
+        self.checkpoint: str = checkpoint
+        self.client_factory: Callable[[Transport], FrenchBee] = client_factory
+
+    def completed(self) -> Set[str]:
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return set()
+        with open(self.checkpoint) as f:
+            return {json.loads(line)["key"] for line in f if line.strip()}
+
+    def run(self) -> Iterator[SweepResult]:
+        done: Set[str] = self.completed()
+        pending: Iterator[WorkUnit] = (
+            unit for unit in self.units if unit.key not in done
+        )
+        checkpoint = open(self.checkpoint, "a") if self.checkpoint else None
+        try:
+            with ProcessPoolExecutor(
+                self.processes,
+                initializer=_init_worker,
+                initargs=(self.concurrency, 1 / self.processes, self.client_factory),
+            ) as pool:
+                in_flight: Set[Future] = set()
+                while True:
+                    # keep two chunks per process queued, planning lazily
+                    while len(in_flight) < self.processes * 2:
+                        chunk: List[WorkUnit] = list(islice(pending, self.chunk_size))
+                        if not chunk:
+                            break
+                        in_flight.add(pool.submit(_run_chunk, chunk))
+                    if not in_flight:
+                        break
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        for result in future.result():
+                            yield result
+                            # only once the caller has taken the result
+                            if checkpoint and result.error is None:
+                                checkpoint.write(
+                                    json.dumps({"key": result.unit.key}) + "\n"
+                                )
+                        if checkpoint:
+                            checkpoint.flush()
+        finally:
+            if checkpoint:
+                checkpoint.close()
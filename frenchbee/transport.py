@@ -0,0 +1,204 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests import Response, Session
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+from urllib3.exceptions import NewConnectionError
+
+from .errors import BlockedError, CircuitOpenError, UnexpectedResponseError
+from .ratelimit import HostPolicy, RateLimiter, RetryPolicy
+
+try:
+    import brotli  # noqa: F401 - urllib3 decodes br responses when it is installed
+
+    ACCEPT_ENCODING: str = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING: str = "gzip, deflate"
+
+SITE_HOST: str = "us.frenchbee.com"
+DEFAULT_POOL_SIZES: Dict[str, int] = {
+    SITE_HOST: 10,
+    "vols.frenchbee.com": 4,
+}
+
+
+def raise_for_status(response: Response) -> Response:
+    if response.status_code == 403:
+        raise BlockedError(f"{response.url} rejected the request (403).")
+    if response.status_code >= 400:
+        raise UnexpectedResponseError(
+            f"{response.url} returned status {response.status_code}."
+        )
+    return response
+
+
+def _never_sent(ex: Exception) -> bool:
+    """Whether the request failed before it reached the server."""
+    if isinstance(ex, ConnectTimeout):
+        return True
+    reason: Any = getattr(ex.args[0], "reason", None) if ex.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _retry_after(response: Response) -> Optional[float]:
+    value: str = response.headers.get("Retry-After")
+    return float(value) if value and value.isdigit() else None
+
+
+class TransportSession(Session):
+    """
+    Session that applies default timeouts and, per host, the rate limiter's token
+    bucket, adaptive concurrency limit and circuit breaker, retrying throttled,
+    failed and timed out requests with jittered backoff. Other methods than the
+    policy's `idempotent_methods` are only retried when throttled or when they
+    could not be sent, unless a call passes `idempotent=True`.
+    """
+
+    def __init__(
+        self,
+        timeout: Tuple[float, float],
+        retry: RetryPolicy = None,
+        limiter: RateLimiter = None,
+    ) -> None:
+        super().__init__()
+        self.timeout: Tuple[float, float] = timeout
+        self.retry: RetryPolicy = retry or RetryPolicy(attempts=1)
+        self.limiter: RateLimiter = limiter
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Response:
+        kwargs.setdefault("timeout", self.timeout)
+        idempotent: bool = kwargs.pop(
+            "idempotent", method.upper() in self.retry.idempotent_methods
+        )
+        host: str = urlsplit(url).hostname
+        policy: HostPolicy = self.limiter.policy(host) if self.limiter else HostPolicy()
+        for attempt in range(self.retry.attempts):
+            last_attempt: bool = attempt == self.retry.attempts - 1
+            if attempt:
+                policy.metrics.retries += 1
+            if policy.breaker:
+                try:
+                    policy.breaker.before_request(host)
+                except CircuitOpenError:
+                    policy.metrics.rejected += 1
+                    raise
+            if policy.bucket:
+                policy.metrics.rate_limit_wait += policy.bucket.acquire()
+            if policy.concurrency:
+                policy.concurrency.acquire()
+            policy.metrics.requests += 1
+
+            response: Response = None
+            success: bool = False
+            try:
+                response = super().request(method, url, **kwargs)
+                success = response.status_code < 400 or (
+                    response.status_code not in self.retry.retry_statuses
+                    and response.status_code != 403
+                )
+            except (ConnectionError, Timeout) as ex:
+                policy.metrics.connection_errors += 1
+                if last_attempt or not (idempotent or _never_sent(ex)):
+                    raise
+            finally:
+                if policy.concurrency:
+                    policy.concurrency.release(success)
+                if policy.breaker:
+                    policy.breaker.record(success)
+
+            if success:
+                policy.metrics.successes += 1
+                return response
+            if response is None:
+                time.sleep(self.retry.delay(attempt))
+                continue
+
+            if response.status_code == 403:
+                policy.metrics.blocked += 1
+                return response  # a new attempt gets the same answer
+            if response.status_code == 429:
+                policy.metrics.throttled += 1
+            else:
+                policy.metrics.server_errors += 1
+            if last_attempt or not (idempotent or response.status_code == 429):
+                return response
+            response.close()
+            time.sleep(self.retry.delay(attempt, _retry_after(response)))
+
+
+class Transport:
+    """
+    One keep-alive `requests` session shared by `FrenchBee`, `FrenchBeeData` and
+    `FrenchBeeReese84`, with a connection pool per French Bee host, retries,
+    per-host rate limiting, gzip/brotli and default connect/read timeouts.
+
+    requests/urllib3 only speak HTTP/1.1, so connections are reused through the
+    pools rather than multiplexed.
+    """
+
+    def __init__(
+        self,
+        pool_sizes: Dict[str, int] = None,
+        default_pool_size: int = 10,
+        connect_timeout: float = 10,
+        read_timeout: float = 30,
+        retries: int = 2,
+        retry: RetryPolicy = None,
+        limiter: RateLimiter = None,
+        rate_limit: bool = True,
+    ) -> None:
+        self.pool_sizes: Dict[str, int] = dict(DEFAULT_POOL_SIZES)
+        self.pool_sizes.update(pool_sizes or {})
+        self.limiter: RateLimiter = limiter or (RateLimiter() if rate_limit else None)
+        self.session: TransportSession = TransportSession(
+            timeout=(connect_timeout, read_timeout),
+            retry=retry or RetryPolicy(attempts=retries + 1),
+            limiter=self.limiter,
+        )
+        self.session.headers["accept-encoding"] = ACCEPT_ENCODING
+        self.session.cookies["base_host"] = "frenchbee.com"
+        self.session.cookies["market_lang"] = "en"
+        self.session.cookies["site_origin"] = "us.frenchbee.com"
+
+        self._lock: threading.Lock = threading.Lock()
+
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=default_pool_size))
+        for host, size in self.pool_sizes.items():
+            # a pool per host: other market sites share the site's adapter
+            self.session.mount(
+                f"https://{host}", HTTPAdapter(pool_connections=8, pool_maxsize=size)
+            )
+
+    def add_host(self, host: str, like: str = SITE_HOST) -> None:
+        """
+        Serve `host`, e.g. the site of another market, through the adapter of
+        `like` and with a rate limit policy built like its own.
+        """
+        if host in self.pool_sizes:
+            return
+        with self._lock:
+            if host in self.pool_sizes:
+                return
+            adapter: BaseAdapter = self.session.get_adapter(f"https://{like}/")
+            adapters: Dict[str, BaseAdapter] = {
+                **self.session.adapters,
+                f"https://{host}": adapter,
+            }
+            # swap in a new mapping, longest prefix first as `Session.mount` keeps
+            # it, rather than mutate the one other threads are matching against
+            self.session.adapters = OrderedDict(
+                sorted(adapters.items(), key=lambda item: len(item[0]), reverse=True)
+            )
+            if self.limiter:
+                self.limiter.register(host, like)
+            self.pool_sizes[host] = self.pool_sizes.get(like, 0)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return self.limiter.metrics() if self.limiter else {}
+
+    def close(self) -> None:
+        self.session.close()
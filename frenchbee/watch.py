@@ -0,0 +1,273 @@
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+import heapq
+import json
+import os
+import time
+from typing import Callable, Dict, IO, List, Optional, Tuple
+
+from .frenchbee import FrenchBee
+from .models import CalendarTarget, Flight, Trip
+from .serialize import JsonLinesWriter
+
+
+@dataclass
+class WatchTarget(CalendarTarget):
+    """
+    One calendar to watch. Only days between `start` and `end` (inclusive, when
+    given), and `days_out[0]` to `days_out[1]` days from now when `days_out` is
+    set, are compared.
+    """
+
+    start: datetime = None
+    end: datetime = None
+    days_out: Tuple[int, Optional[int]] = None
+
+    def window(self, now: datetime) -> Tuple[datetime, datetime]:
+        """The first and last watched day as of `now`, either of which may be None."""
+        start: datetime = self.start
+        end: datetime = self.end
+        if self.days_out:
+            today: datetime = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            near, far = self.days_out
+            start = max(filter(None, (start, today + timedelta(days=near))))
+            if far is not None:
+                end = min(filter(None, (end, today + timedelta(days=far))))
+        return start, end
+
+    def horizon(self, now: datetime) -> int:
+        """Days until the nearest watched day."""
+        start, _ = self.window(now)
+        nearest: datetime = max(filter(None, (self.departure, start)), default=now)
+        return max((nearest.date() - now.date()).days, 0)
+
+
+def split_bands(
+    target: WatchTarget, edges: Tuple[int, ...] = (14, 60, 180)
+) -> List[WatchTarget]:
+    """
+    One target per band of days from now: up to `edges[0]` days out, then up to
+    `edges[1]` and so on, and beyond the last edge. The bands share the target's
+    key and snapshot but each compares only its own days, so that the near days
+    of a calendar are compared more often than its far ones. `PriceWatcher.run`
+    fetches the calendar once for the bands that are due together.
+    """
+    lows: Tuple[int, ...] = (0,) + tuple(edge + 1 for edge in edges)
+    highs: Tuple[Optional[int], ...] = tuple(edges) + (None,)
+    return [replace(target, days_out=band) for band in zip(lows, highs)]
+
+
+@dataclass
+class PriceChange:
+    target: str
+    day: datetime
+    change: str  # new, removed, price or offer
+    price: float = None
+    old_price: float = None
+    is_offer: bool = None
+    old_is_offer: bool = None
+    currency: str = None
+    observed_at: datetime = None
+
+
+# (price, tax, is_offer) per ISO day, per target key
+Snapshot = Dict[str, Tuple[float, float, bool]]
+
+
+class WatchState:
+    """Last seen calendar per target, optionally persisted to a JSON file."""
+
+    def __init__(self, path: str = None) -> None:
+        self.path: str = path
+        self.snapshots: Dict[str, Snapshot] = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.snapshots = {
+                    key: {day: tuple(value) for day, value in days.items()}
+                    for key, days in json.load(f).items()
+                }
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        temp_path: str = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.snapshots, f, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+
+
+def _snapshot(flights: Dict[datetime, Flight]) -> Snapshot:
+    return {
+        f"{day:%Y-%m-%d}": (flight.price, flight.tax, bool(flight.is_offer))
+        for day, flight in flights.items()
+    }
+
+
+def default_interval(base: float, horizon: int) -> float:
+    """Poll near-term calendars every `base` seconds and far ones less often."""
+    if horizon <= 14:
+        return base
+    if horizon <= 60:
+        return base * 2
+    if horizon <= 180:
+        return base * 4
+    return base * 8
+
+
+class PriceWatcher:
+    def __init__(
+        self,
+        targets: List[WatchTarget],
+        client: FrenchBee = None,
+        state: WatchState = None,
+        base_interval: float = 300,
+        interval: Callable[[float, int], float] = default_interval,
+        on_poll: Callable[[WatchTarget, Dict[datetime, Flight]], None] = None,
+    ) -> None:
+        self.targets: List[WatchTarget] = targets
+        self.client: FrenchBee = client or FrenchBee()
+        self.state: WatchState = state or WatchState()
+        self.base_interval: float = base_interval
+        self.interval: Callable[[float, int], float] = interval
+        self.on_poll: Callable[[WatchTarget, Dict[datetime, Flight]], None] = on_poll
+        # latest (fetched at, calendar) per target key, shared by its bands
+        self._fetched: Dict[str, Tuple[float, Dict[datetime, Flight]]] = {}
+
+    def poll(self, target: WatchTarget, max_age: float = 0) -> List[PriceChange]:
+        """
+        Compare the target's days with the last snapshot. The calendar fetched
+        for another band of the same target is reused when it is less than
+        `max_age` seconds old.
+        """
+        now: datetime = datetime.now()
+        start, end = target.window(now)
+        if start and end and start > end:  # no watched day in this band yet
+            return []
+
+        flights: Dict[datetime, Flight] = self._fetch(target, max_age)
+        if not flights:  # keep the last snapshot rather than report every day gone
+            return []
+        watched: Dict[datetime, Flight] = {
+            day: flight
+            for day, flight in flights.items()
+            if (not target.start or day >= target.start)
+            and (not target.end or day <= target.end)
+        }
+        flights = {
+            day: flight
+            for day, flight in watched.items()
+            if (not start or day >= start) and (not end or day <= end)
+        }
+        if self.on_poll:
+            self.on_poll(target, flights)
+
+        observed_at: datetime = now.replace(microsecond=0)
+        previous: Optional[Snapshot] = self.state.snapshots.get(target.key)
+        if previous is None:  # first sighting is the baseline, not a change
+            self.state.snapshots[target.key] = _snapshot(watched)
+            return []
+
+        current: Snapshot = _snapshot(flights)
+        first: str = f"{start:%Y-%m-%d}" if start else ""
+        last: str = f"{end:%Y-%m-%d}" if end else "~"
+        self.state.snapshots[target.key] = {
+            **{
+                day: value
+                for day, value in previous.items()
+                if not first <= day <= last
+            },
+            **current,
+        }
+
+        changes: List[PriceChange] = []
+        for day, flight in sorted(flights.items()):
+            old: Tuple[float, float, bool] = previous.get(f"{day:%Y-%m-%d}")
+            change: str = None
+            if old is None:
+                change = "new"
+            elif old[0] != flight.price:
+                change = "price"
+            elif old[2] != bool(flight.is_offer):
+                change = "offer"
+            if change:
+                changes.append(
+                    PriceChange(
+                        target=target.key,
+                        day=day,
+                        change=change,
+                        price=flight.price,
+                        old_price=old[0] if old else None,
+                        is_offer=bool(flight.is_offer),
+                        old_is_offer=old[2] if old else None,
+                        currency=flight.currency,
+                        observed_at=observed_at,
+                    )
+                )
+        for day in sorted(
+            day for day in set(previous) - set(current) if first <= day <= last
+        ):
+            changes.append(
+                PriceChange(
+                    target=target.key,
+                    day=datetime.strptime(day, "%Y-%m-%d"),
+                    change="removed",
+                    old_price=previous[day][0],
+                    old_is_offer=previous[day][2],
+                    observed_at=observed_at,
+                )
+            )
+        return changes
+
+    def _fetch(self, target: WatchTarget, max_age: float) -> Dict[datetime, Flight]:
+        fetched: Optional[Tuple[float, Dict[datetime, Flight]]] = self._fetched.get(
+            target.key
+        )
+        if fetched and time.time() - fetched[0] < max_age:
+            return fetched[1]
+        trip: Trip = target.trip()
+        flights: Dict[datetime, Flight] = (
+            self.client.get_return_availability(trip)
+            if target.departure
+            else self.client.get_departure_availability(trip)
+        )
+        if flights:
+            self._fetched[target.key] = (time.time(), flights)
+        return flights
+
+    def run(
+        self,
+        stream: IO[str],
+        once: bool = False,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Poll every target on its own schedule, writing changes as JSON Lines. Bands
+        of one target that come due within `base_interval` of each other share
+        one fetch of the calendar.
+        """
+        writer: JsonLinesWriter = JsonLinesWriter(stream)
+        schedule: List[Tuple[float, int]] = [
+            (time.time(), idx) for idx in range(len(self.targets))
+        ]
+        heapq.heapify(schedule)
+        while schedule:
+            due, idx = heapq.heappop(schedule)
+            delay: float = due - time.time()
+            if delay > 0:
+                sleep(delay)
+
+            target: WatchTarget = self.targets[idx]
+            try:
+                writer.write_all(self.poll(target, max_age=self.base_interval))
+                writer.flush()
+                self.state.save()
+            except Exception as ex:
+                writer.write({"target": target.key, "error": repr(ex)})
+                writer.flush()
+
+            if not once:
+                horizon: int = target.horizon(datetime.now())
+                next_due: float = time.time() + self.interval(
+                    self.base_interval, horizon
+                )
+                heapq.heappush(schedule, (next_due, idx))
@@ -0,0 +1,218 @@
+"""
+Offline stand-ins for the French Bee endpoints.
+
+A cassette is a JSON list of recorded exchanges, each one
+`{"method", "url", "form", "status", "headers", "body"}` where `form` holds the
+form fields a request must carry to match (e.g. `_triggering_element_name`) and
+`body` names a file next to the cassette.
+
+- `ReplayAdapter` answers requests from a cassette without touching the network,
+  with a 304 when a request's If-None-Match is the recorded ETag.
+- `RecordingAdapter` forwards requests upstream and appends them to a cassette.
+- `StandInServer` serves a cassette over a local HTTP socket, and
+  `LocalServerAdapter` routes the clients' https:// French Bee URLs to it.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from frenchbee.transport import Transport
+
+FIXTURES: str = os.path.join(os.path.dirname(__file__), "fixtures")
+MATCH_FIELDS: Tuple[str, ...] = ("_triggering_element_name",)
+
+
+def _form(body: Any) -> Dict[str, str]:
+    if not body:
+        return {}
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", "replace")
+    return dict(parse_qsl(body))
+
+
+def _without_scheme(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+
+class Cassette:
+    def __init__(self, path: str = os.path.join(FIXTURES, "cassette.json")) -> None:
+        self.path: str = path
+        self.directory: str = os.path.dirname(path)
+        self.entries: List[Dict[str, Any]] = []
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+        self._bodies: Dict[str, bytes] = {}
+
+    def find(
+        self, method: str, url: str, form: Dict[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        target: str = _without_scheme(url)
+        for entry in self.entries:
+            if entry["method"] != method or _without_scheme(entry["url"]) != target:
+                continue
+            if all(form.get(key) == value for key, value in entry["form"].items()):
+                return entry
+        return None
+
+    def body(self, entry: Dict[str, Any]) -> bytes:
+        name: str = entry["body"]
+        if name not in self._bodies:
+            with open(os.path.join(self.directory, name), "rb") as f:
+                self._bodies[name] = f.read()
+        return self._bodies[name]
+
+    def add(self, entry: Dict[str, Any], body: bytes) -> None:
+        with open(os.path.join(self.directory, entry["body"]), "wb") as f:
+            f.write(body)
+        self.entries.append(entry)
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f, indent=4)
+
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, cassette: Cassette = None) -> None:
+        super().__init__()
+        self.cassette: Cassette = cassette or Cassette()
+        self.requests: List[PreparedRequest] = []
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        self.requests.append(request)
+        entry: Dict[str, Any] = self.cassette.find(
+            request.method, request.url, _form(request.body)
+        )
+        response: Response = Response()
+        response.request = request
+        response.url = request.url
+        if entry is None:
+            response.status_code = 404
+            response._content = b""
+            response._content_consumed = True
+            return response
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        etag: str = response.headers.get("ETag")
+        if etag and request.headers.get("If-None-Match") == etag:
+            response.status_code = 304
+            response._content = b""
+            response._content_consumed = True
+            return response
+        response.status_code = entry["status"]
+        response.encoding = "utf-8"
+        response._content = self.cassette.body(entry)
+        response._content_consumed = True
+        response.raw = io.BytesIO(response._content)
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingAdapter(HTTPAdapter):
+    def __init__(self, cassette: Cassette, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.cassette: Cassette = cassette
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        response: Response = super().send(request, **kwargs)
+        form: Dict[str, str] = _form(request.body)
+        name: str = f"recorded_{len(self.cassette.entries)}"
+        self.cassette.add(
+            {
+                "method": request.method,
+                "url": request.url,
+                "form": {key: form[key] for key in MATCH_FIELDS if key in form},
+                "status": response.status_code,
+                "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+                "body": name,
+            },
+            response.content,
+        )
+        return response
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    cassette: Cassette = None
+
+    def _serve(self) -> None:
+        length: int = int(self.headers.get("Content-Length") or 0)
+        body: bytes = self.rfile.read(length) if length else b""
+        url: str = f"https://{self.headers['Host']}{self.path}"
+        entry: Dict[str, Any] = self.cassette.find(self.command, url, _form(body))
+        if entry is None:
+            self.send_error(404)
+            return
+        content: bytes = self.cassette.body(entry)
+        self.send_response(entry["status"])
+        for key, value in entry["headers"].items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = _serve
+    do_POST = _serve
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StandInServer:
+    def __init__(self, cassette: Cassette = None) -> None:
+        handler: type = type(
+            "StandInHandler", (_StandInHandler,), {"cassette": cassette or Cassette()}
+        )
+        handler.protocol_version = "HTTP/1.1"  # keep-alive, like the real hosts
+        handler.disable_nagle_algorithm = True
+        self.server: ThreadingHTTPServer = ThreadingHTTPServer(
+            ("127.0.0.1", 0), handler
+        )
+        self.server.daemon_threads = True
+        self.thread: threading.Thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StandInServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class LocalServerAdapter(HTTPAdapter):
+    """Send https://<host>/... requests to the stand-in server, keeping the Host."""
+
+    def __init__(self, server_url: str, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.server_url: str = server_url
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        parts = urlsplit(request.url)
+        request.headers["Host"] = parts.netloc
+        request.url = (
+            self.server_url + request.url[len(f"{parts.scheme}://{parts.netloc}") :]
+        )
+        return super().send(request, **kwargs)
+
+
+def mount(transport: Transport, adapter: BaseAdapter) -> Transport:
+    """Route every French Bee host of `transport` through `adapter`."""
+    transport.session.mount("https://", adapter)
+    for host in transport.pool_sizes:
+        transport.session.mount(f"https://{host}", adapter)
+    return transport
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from frenchbee import FrenchBee, PassengerInfo
+from frenchbee.aio import AsyncFrenchBee
+from frenchbee.errors import UnexpectedResponseError
+from frenchbee.transport import Transport
+
+from .replay import Cassette, ReplayAdapter, mount
+from .test_offline import make_trip
+
+
+class CountingAdapter(ReplayAdapter):
+    """Replays slowly, counting requests in flight; 9 adults get a 404."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.missing: ReplayAdapter = ReplayAdapter(
+            Cassette(os.path.join(tempfile.mkdtemp(), "empty.json"))
+        )
+        self.lock: threading.Lock = threading.Lock()
+        self.in_flight: int = 0
+        self.peak: int = 0
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(0.02)
+            if "adults-count=9" in str(request.body):
+                return self.missing.send(request, **kwargs)
+            return super().send(request, **kwargs)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def trip_for(adults: int):
+    trip = make_trip()
+    trip.passengers = PassengerInfo(Adults=adults)
+    return trip
+
+
+class AsyncFrenchBeeTests(unittest.TestCase):
+    def setUp(self):
+        self.adapter = CountingAdapter()
+        transport = mount(Transport(retries=0, rate_limit=False), self.adapter)
+        self.client = AsyncFrenchBee(FrenchBee(transport=transport), concurrency=2)
+        self.addCleanup(self.client.close)
+
+    def test_results_in_order(self):
+        trips = [trip_for(adults) for adults in range(1, 4)]
+        results = asyncio.run(self.client.gather_flight_times(trips))
+        for trip, result in zip(trips, results):
+            self.assertIs(result, trip)
+            self.assertEqual(len(result.origin_segments), 12)
+
+    def test_at_most_concurrency_in_flight(self):
+        trips = [trip_for(adults) for adults in range(1, 7)]
+        results = asyncio.run(self.client.gather_departure_availability(trips))
+        self.assertEqual(len(results), 6)
+        self.assertEqual(len(self.adapter.requests), 6)
+        self.assertEqual(self.adapter.peak, 2)
+
+    def test_return_exceptions(self):
+        trips = [trip_for(adults) for adults in (1, 9, 2)]
+        results = asyncio.run(
+            self.client.gather_departure_availability(trips, return_exceptions=True)
+        )
+        self.assertIsInstance(results[1], UnexpectedResponseError)
+        self.assertEqual(results[0], results[2])
+        self.assertGreater(len(results[0]), 0)
+
+        with self.assertRaises(UnexpectedResponseError):
+            asyncio.run(self.client.gather_return_availability(trips))
@@ -0,0 +1,80 @@
+from datetime import datetime
+import re
+import unittest
+
+from frenchbee import FrenchBee, PassengerInfo
+from frenchbee.batch import fetch_table
+from frenchbee.models import Market
+from frenchbee.transport import Transport
+
+from .replay import ReplayAdapter, mount
+
+
+class AnyMarketAdapter(ReplayAdapter):
+    """Answer every market's search from the us.frenchbee.com cassette."""
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        request = request.copy()
+        request.url = re.sub(r"//[^/]+/\w+\?", "//us.frenchbee.com/en?", request.url)
+        response = super().send(request, **kwargs)
+        self.requests.pop()
+        return response
+
+
+class BatchTests(unittest.TestCase):
+    def setUp(self):
+        self.adapter = AnyMarketAdapter()
+        self.client = FrenchBee(
+            transport=mount(Transport(rate_limit=False), self.adapter)
+        )
+        self.markets = [Market(), Market("fr.frenchbee.com", "fr")]
+
+    def test_fetch_table(self):
+        mixes = [
+            PassengerInfo(Adults=1),
+            PassengerInfo(Adults=2, Children=1),
+            PassengerInfo(Adults=1),  # asked once
+        ]
+        table = fetch_table(self.client, "EWR", "ORY", mixes, self.markets + [Market()])
+        self.assertEqual(table.calls, 4)
+        self.assertEqual(len(self.adapter.requests), 4)
+        self.assertEqual(len(table.calendars), 4)
+        self.assertEqual(table.unique, 1)  # the cassette answers alike
+
+        urls = sorted({request.url for request in self.adapter.requests})
+        self.assertEqual(
+            urls,
+            [
+                "https://fr.frenchbee.com/fr?ajax_form=1",
+                "https://us.frenchbee.com/en?ajax_form=1",
+            ],
+        )
+        french = [r for r in self.adapter.requests if "fr.frenchbee" in r.url]
+        self.assertIn("site_origin=fr.frenchbee.com", french[0].headers["Cookie"])
+        self.assertIn("market_lang=fr", french[0].headers["Cookie"])
+
+        flight = table.get("2-1-0", self.markets[1], datetime(2022, 10, 6))
+        self.assertEqual(flight.departure_airport, "EWR")
+        rows = list(table.rows())
+        self.assertEqual(len(rows), 4 * len(table.calendar("1-0-0", Market())))
+        self.assertEqual(rows[0].mix, "1-0-0")
+
+    def test_market_hosts_get_the_site_pool_and_policy(self):
+        transport = mount(Transport(), self.adapter)
+        client = FrenchBee(transport=transport)
+        fetch_table(client, "EWR", "ORY", [PassengerInfo(Adults=1)], self.markets)
+
+        session = transport.session
+        self.assertIs(
+            session.get_adapter("https://fr.frenchbee.com/fr"),
+            session.get_adapter("https://us.frenchbee.com/en"),
+        )
+        metrics = transport.metrics()
+        self.assertEqual(metrics["fr.frenchbee.com"]["requests"], 1)
+        self.assertEqual(
+            metrics["fr.frenchbee.com"]["concurrency_limit"],
+            metrics["us.frenchbee.com"]["concurrency_limit"],
+        )
+        policy = transport.limiter.policy
+        self.assertIsNot(policy("fr.frenchbee.com"), policy("us.frenchbee.com"))
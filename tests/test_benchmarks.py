@@ -0,0 +1,97 @@
+"""
+Throughput and latency of the parsing hot paths and of an end-to-end
+get_flight_times against the local stand-in server.
+
+    poetry run pytest tests/test_benchmarks.py --benchmark-autosave
+    poetry run pytest tests/test_benchmarks.py --benchmark-compare
+
+Saved runs go to .benchmarks/ so regressions show up against earlier results.
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pytest
+
+from frenchbee import FrenchBee, PassengerInfo, Trip, DateAndLocation, Location
+from frenchbee.transport import Transport
+
+from .replay import FIXTURES, LocalServerAdapter, ReplayAdapter, StandInServer, mount
+
+pytest.importorskip("pytest_benchmark")
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def trip() -> Trip:
+    return Trip(
+        origin_depart=DateAndLocation(
+            date=datetime(2022, 10, 6), location=Location("EWR")
+        ),
+        destination_return=DateAndLocation(
+            date=datetime(2022, 10, 10), location=Location("ORY")
+        ),
+        passengers=PassengerInfo(Adults=1),
+    )
+
+
+@pytest.fixture
+def replay_client() -> FrenchBee:
+    return FrenchBee(transport=mount(Transport(rate_limit=False), ReplayAdapter()))
+
+
+@pytest.fixture
+def flight_times_script() -> Dict[str, Any]:
+    client: FrenchBee = FrenchBee()
+    return client._get_flight_times_script(read_fixture("flight_times.html"))
+
+
+def test_make_search_request(benchmark, replay_client: FrenchBee, trip: Trip) -> None:
+    payload = benchmark(
+        replay_client._make_search_request,
+        source="EWR",
+        destination="ORY",
+        passengers=trip.passengers,
+        departure=None,
+        returns=None,
+        module="visible_newsearch_flights_to",
+    )
+    assert payload[-1].args[0] == "departureCalendarPriceIsReady"
+
+
+def test_normalize_response(benchmark) -> None:
+    payload: List[Dict[str, Any]] = json.loads(read_fixture("search_departure.json"))
+    calendar: Dict[str, Any] = payload[-1]["args"][1]["departure"]
+    flights = benchmark(FrenchBee()._normalize_response, calendar)
+    assert len(flights) > 100
+
+
+def test_get_flight_times_script(benchmark) -> None:
+    html_body: str = read_fixture("flight_times.html")
+    script = benchmark(FrenchBee()._get_flight_times_script, html_body)
+    assert "pageDefinitionConfig" in script
+
+
+def test_get_segment_options(benchmark, flight_times_script: Dict[str, Any]) -> None:
+    client: FrenchBee = FrenchBee()
+    bounds: List[Dict[str, Any]] = client._get_json_path(
+        flight_times_script,
+        "$.pageDefinitionConfig.pageData.business.Availability.proposedBounds",
+    )
+    options: List[Dict[str, Any]] = bounds[0]["proposedFlightsGroup"]
+    segments = benchmark(lambda: list(client._get_segment_options(options)))
+    assert len(segments) == len(options)
+
+
+def test_get_flight_times(benchmark, trip: Trip) -> None:
+    with StandInServer() as server:
+        client: FrenchBee = FrenchBee(
+            transport=mount(Transport(rate_limit=False), LocalServerAdapter(server.url))
+        )
+        result: Trip = benchmark(client.get_flight_times, trip)
+    assert len(result.origin_segments) == 12
@@ -0,0 +1,109 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+from frenchbee import FrenchBee
+from frenchbee.cache import Cache, MemoryCache, SqliteCache
+from frenchbee.transport import Transport
+
+from .replay import ReplayAdapter, mount
+from .test_offline import make_trip
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now: float = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+class CacheTests:
+    """Run against each backend by the test cases below."""
+
+    def make_cache(self, **kwargs) -> Cache:
+        raise NotImplementedError
+
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch("frenchbee.cache.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.adapter = ReplayAdapter()
+        self.transport = mount(Transport(rate_limit=False), self.adapter)
+
+    def test_hits_and_ttl_expiry(self):
+        cache = self.make_cache(ttl=60)
+        client = FrenchBee(transport=self.transport, cache=cache)
+        first = client.get_departure_availability(make_trip())
+        self.clock.now += 30
+        self.assertEqual(client.get_departure_availability(make_trip()), first)
+        self.assertEqual(len(self.adapter.requests), 1)
+
+        self.clock.now += 31
+        self.assertEqual(client.get_departure_availability(make_trip()), first)
+        self.assertEqual(len(self.adapter.requests), 2)
+        self.assertEqual(
+            cache.stats.json(),
+            {"hits": 1, "misses": 2, "evictions": 0, "expirations": 1},
+        )
+
+    def test_least_recently_used_is_evicted(self):
+        cache = self.make_cache(max_entries=2)
+        for key in ("a", "b"):
+            cache.set(key, key)
+            self.clock.now += 1
+        self.assertEqual(cache.get("a"), "a")
+        self.clock.now += 1
+        cache.set("c", "c")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), ("a", "c"))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_max_bytes(self):
+        client = FrenchBee(transport=self.transport)
+        calendar = client.get_departure_availability(make_trip())
+        size = len(pickle.dumps(calendar, protocol=pickle.HIGHEST_PROTOCOL))
+        cache = self.make_cache(max_bytes=size * 5 // 2)
+        for key in ("a", "b", "c"):
+            cache.set(key, calendar)
+            self.clock.now += 1
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), calendar)
+        self.assertEqual(cache.stats.evictions, 1)
+
+
+class MemoryCacheTests(CacheTests, unittest.TestCase):
+    def make_cache(self, **kwargs) -> Cache:
+        return MemoryCache(**kwargs)
+
+
+class SqliteCacheTests(CacheTests, unittest.TestCase):
+    def make_cache(self, path: str = None, **kwargs) -> Cache:
+        cache = SqliteCache(path or os.path.join(tempfile.mkdtemp(), "cache"), **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_entries_survive_reopening(self):
+        path = os.path.join(tempfile.mkdtemp(), "cache")
+        cache = self.make_cache(path, ttl=60)
+        first = FrenchBee(
+            transport=self.transport, cache=cache
+        ).get_departure_availability(make_trip())
+        cache.close()
+
+        reopened = self.make_cache(path, ttl=60)
+        client = FrenchBee(transport=self.transport, cache=reopened)
+        self.assertEqual(client.get_departure_availability(make_trip()), first)
+        self.assertEqual(len(self.adapter.requests), 1)
+        self.assertEqual(reopened.stats.hits, 1)
+
+
+class AbstractCacheTests(unittest.TestCase):
+    def test_cache_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Cache()
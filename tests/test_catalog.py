@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+from typing import Any
+import unittest
+from unittest import mock
+
+from requests import ConnectionError, PreparedRequest, Response
+
+from frenchbee import FrenchBeeData
+from frenchbee.catalog import LocationCatalog
+from frenchbee.transport import Transport
+
+from .replay import ReplayAdapter, mount
+from .test_cache import Clock
+
+
+class OfflineAdapter(ReplayAdapter):
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        self.requests.append(request)
+        raise ConnectionError("offline")
+
+
+class LocationCatalogTests(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "locations.json")
+        self.adapter = ReplayAdapter()
+        self.data_client = FrenchBeeData(
+            mount(Transport(rate_limit=False), self.adapter)
+        )
+
+    def catalog(self, **kwargs) -> LocationCatalog:
+        return LocationCatalog(self.path, data_client=self.data_client, **kwargs)
+
+    def test_lookups(self):
+        catalog = self.catalog()
+        self.assertEqual(len(catalog), 8)
+        self.assertIn("ewr", catalog)
+        self.assertNotIn("XXX", catalog)
+        self.assertEqual(catalog.get("RUN").name, "Saint-Denis, Réunion")
+        self.assertEqual(
+            [location.code for location in catalog.search("pa")], ["PPT", "ORY"]
+        )
+        self.assertEqual([location.code for location in catalog.search("sfo")], ["SFO"])
+
+    def test_cached_on_disk(self):
+        self.assertEqual(len(self.catalog().codes), 8)
+        self.assertEqual(len(self.adapter.requests), 1)
+
+        self.assertEqual(self.catalog().codes, self.catalog().codes)
+        self.assertEqual(len(self.adapter.requests), 1)
+
+        self.catalog(max_age=0).codes  # stale, so revalidated
+        self.assertEqual(len(self.adapter.requests), 2)
+        self.assertNotIn("if-none-match", self.adapter.requests[0].headers)
+        self.assertEqual(self.adapter.requests[1].headers["if-none-match"], '"home-1"')
+
+    def test_not_modified(self):
+        codes = self.catalog().codes
+        catalog = self.catalog(max_age=0)
+        self.assertFalse(catalog.refresh())  # answered 304
+        self.assertEqual(catalog.codes, codes)
+        self.assertEqual(len(self.adapter.requests), 3)
+
+        # the 304 counts as a check, so a fresh catalog reads the file alone
+        self.assertEqual(self.catalog().codes, codes)
+        self.assertEqual(len(self.adapter.requests), 3)
+
+        self.assertFalse(catalog.refresh(force=True))  # unconditional, same data
+        self.assertNotIn("if-none-match", self.adapter.requests[-1].headers)
+
+    def test_offline_with_a_stale_catalog(self):
+        codes = self.catalog().codes
+        adapter = OfflineAdapter()
+        catalog = LocationCatalog(
+            self.path,
+            data_client=FrenchBeeData(
+                mount(Transport(retries=0, rate_limit=False), adapter)
+            ),
+            max_age=0,
+        )
+        clock = Clock()
+        clock.now = time.time()
+        with mock.patch("frenchbee.catalog.time", clock):
+            for _ in range(5):
+                self.assertEqual(catalog.codes, codes)
+            self.assertEqual(len(adapter.requests), 1)
+
+            clock.now += catalog.retry_after
+            self.assertIn("EWR", catalog)
+            self.assertEqual(len(adapter.requests), 2)
@@ -0,0 +1,87 @@
+from array import array
+from datetime import datetime, timedelta
+import unittest
+
+from frenchbee.calendars import FlightCalendar
+
+try:
+    import numpy
+except ImportError:  # numpy is optional
+    numpy = None
+
+START: datetime = datetime(2022, 10, 1)
+
+
+def make_calendar(prices, currency="USD", skip=()) -> FlightCalendar:
+    days = [
+        (START + timedelta(days=offset)).toordinal()
+        for offset in range(len(prices) + len(skip))
+        if offset not in skip
+    ]
+    return FlightCalendar(
+        "EWR",
+        "ORY",
+        currency,
+        array("l", days),
+        array("d", prices),
+        array("d", [100.0] * len(prices)),
+        array("b", [0] * len(prices)),
+    )
+
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class FareTests(unittest.TestCase):
+    def setUp(self):
+        from frenchbee.fares import FareColumns, FxRates
+
+        self.fx = FxRates("EUR", {"USD": 0.5})
+        self.columns = FareColumns.from_calendars(
+            {
+                "EWR-ORY": make_calendar([300.0, 200.0, 400.0, 250.0, 500.0], skip={2}),
+                "ORY-EWR": make_calendar([90.0, 80.0, 70.0, 60.0, 50.0, 40.0], "EUR"),
+                "SFO-ORY": None,
+            }
+        )
+
+    def test_convert_and_stats(self):
+        columns = self.columns.convert(self.fx)
+        self.assertEqual(columns.keys, ["EWR-ORY", "ORY-EWR"])
+        self.assertEqual(columns.currencies, ["EUR", "EUR"])
+        self.assertEqual(list(columns.prices[:5]), [150.0, 100.0, 200.0, 125.0, 250.0])
+        self.assertEqual(columns.taxes[0], 50.0)
+
+        stats = columns.stats([0, 25, 50, 100])
+        for key in columns.keys:
+            prices = columns.prices[columns.rows(key)]
+            expected = {"min": prices.min()}
+            for q in (0, 25, 50, 100):
+                expected[f"p{q}"] = numpy.percentile(prices, q)
+            self.assertEqual(stats.get(key), expected)
+
+    def test_rolling_min(self):
+        rolling = self.columns.rolling_min(3)
+        expected = []
+        for key in self.columns.keys:
+            rows = self.columns.rows(key)
+            days, prices = self.columns.days[rows], self.columns.prices[rows]
+            for day in days:
+                expected.append(prices[(days > day - 3) & (days <= day)].min())
+        self.assertEqual(list(rolling), expected)
+
+    def test_round_trips(self):
+        trips = self.columns.round_trips("EWR-ORY", "ORY-EWR", 2, 3)
+        expected = sorted(
+            (departure, departure + nights)
+            for departure in self.columns.days[self.columns.rows("EWR-ORY")]
+            for nights in (2, 3)
+            if departure + nights in self.columns.days[self.columns.rows("ORY-EWR")]
+        )
+        self.assertEqual(sorted(zip(trips.departures, trips.returns)), expected)
+        self.assertTrue(all(trips.nights >= 2))
+        self.assertEqual(
+            trips.cheapest(1),
+            [(START + timedelta(days=1), START + timedelta(days=4), 250.0)],
+        )
+        self.assertEqual(trips.price_per_night[0], trips.totals[0] / trips.nights[0])
+        with self.assertRaises(ValueError):
+            self.columns.round_trips("EWR-ORY", "ORY-EWR", 0, 3)
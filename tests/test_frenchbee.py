@@ -1,17 +1,27 @@
+import os
 import unittest
 from datetime import datetime, timedelta
 
-from py_frenchbee.frenchbee import FrenchBee, PassengerInfo
+from frenchbee import FrenchBee, PassengerInfo, Trip, DateAndLocation, Location
 
 
+@unittest.skipUnless(
+    os.environ.get("FRENCHBEE_LIVE"), "set FRENCHBEE_LIVE=1 to query us.frenchbee.com"
+)
 class FrenchBeeTests(unittest.TestCase):
     def test_success(self):
-        origin_date = datetime.today() + timedelta(days=60)
+        origin_date = datetime.today().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ) + timedelta(days=60)
         return_date = origin_date + timedelta(days=7)
-        passengers = PassengerInfo(Adults=1)
+        trip = Trip(
+            origin_depart=DateAndLocation(date=origin_date, location=Location("EWR")),
+            destination_return=DateAndLocation(
+                date=return_date, location=Location("ORY")
+            ),
+            passengers=PassengerInfo(Adults=1),
+        )
 
         client = FrenchBee()
-        return_info = client.get_return_info_for(
-            "EWR", "ORY", passengers, origin_date, return_date
-        )
+        return_info = client.get_return_info_for(trip)
         self.assertGreater(return_info.price, 0, "Flight return price is invalid.")
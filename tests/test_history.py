@@ -0,0 +1,75 @@
+from datetime import datetime
+import os
+import tempfile
+import unittest
+
+from frenchbee import Flight, PassengerInfo
+from frenchbee.history import PriceHistory
+from frenchbee.watch import WatchTarget
+
+
+def make_flight(day: datetime, price: float) -> Flight:
+    return Flight(
+        arrival_airport="ORY",
+        currency="USD",
+        day=day,
+        departure_airport="EWR",
+        is_offer=False,
+        price=price,
+        tax=100.0,
+    )
+
+
+class PriceHistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "history.db")
+        self.history = PriceHistory(self.path, batch_size=3)
+        self.passengers = PassengerInfo(Adults=1)
+
+    def tearDown(self):
+        self.history.close()
+
+    def test_price_over_time(self):
+        day = datetime(2022, 10, 6)
+        for hour, price in enumerate([400.0, 380.0, 420.0]):
+            self.history.record(
+                "EWR-ORY",
+                self.passengers,
+                [make_flight(day, price), make_flight(datetime(2022, 10, 7), 500.0)],
+                observed_at=datetime(2022, 9, 1, hour),
+            )
+        points = self.history.price_over_time("EWR-ORY", day)
+        self.assertEqual([point.price for point in points], [400.0, 380.0, 420.0])
+        self.assertEqual(points[0].observed_at, datetime(2022, 9, 1, 0))
+
+    def test_cheapest_per_month_survives_reopen(self):
+        self.history.record(
+            "EWR-ORY",
+            self.passengers,
+            [
+                make_flight(datetime(2022, 10, 6), 400.0),
+                make_flight(datetime(2022, 10, 20), 350.0),
+                make_flight(datetime(2022, 11, 2), 450.0),
+            ],
+        )
+        self.history.record(
+            "EWR-ORY", self.passengers, [make_flight(datetime(2022, 11, 9), 300.0)]
+        )
+        self.history.close()
+
+        self.history = PriceHistory(self.path)
+        months = self.history.cheapest_per_month("EWR-ORY")
+        self.assertEqual(
+            [(month.month, month.day.day, month.price) for month in months],
+            [("2022-10", 20, 350.0), ("2022-11", 9, 300.0)],
+        )
+
+    def test_record_poll_reverses_return_routes(self):
+        target = WatchTarget(
+            "EWR", "ORY", self.passengers, departure=datetime(2022, 10, 6)
+        )
+        day = datetime(2022, 10, 10)
+        self.history.record_poll(target, {day: make_flight(day, 410.0)})
+        self.assertEqual(self.history.routes(), ["ORY-EWR"])
+        point = self.history.price_over_time("ORY-EWR", day)[0]
+        self.assertEqual(point.departure, datetime(2022, 10, 6))
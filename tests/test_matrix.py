@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+import unittest
+
+from frenchbee import Location, PassengerInfo, Transport
+
+from .test_sweep import replay_client
+
+ROUTE = (Location("EWR"), Location("ORY"))
+START: datetime = datetime(2022, 10, 1)
+END: datetime = datetime(2022, 10, 7)
+
+
+class PriceMatrixTests(unittest.TestCase):
+    def setUp(self):
+        self.client = replay_client(Transport(rate_limit=False))
+
+    def test_returns_after_the_departure_range(self):
+        matrix = self.client.get_price_matrix(
+            ROUTE, PassengerInfo(Adults=1), (START, END)
+        )
+        self.assertTrue(all(START <= day <= END for day in matrix.departures))
+        self.assertGreater(max(matrix.returns), END)
+        for departure in matrix.departures:
+            self.assertTrue(
+                all(day >= departure for day in matrix.return_flights[departure])
+            )
+
+        departure, returns = matrix.departures[0], datetime(2022, 10, 20)
+        self.assertEqual(
+            matrix.price(departure, returns),
+            matrix.departure_flights[departure].price
+            + matrix.return_flights[departure][returns].price,
+        )
+        self.assertIsNone(matrix.price(departure, departure - timedelta(days=1)))
+
+    def test_return_range(self):
+        return_range = (datetime(2022, 10, 10), datetime(2022, 10, 20))
+        matrix = self.client.get_price_matrix(
+            ROUTE, PassengerInfo(Adults=1), (START, END), return_range
+        )
+        self.assertEqual(min(matrix.returns), datetime(2022, 10, 10))
+        self.assertLessEqual(max(matrix.returns), datetime(2022, 10, 20))
+
+    def test_cheapest(self):
+        matrix = self.client.get_price_matrix(
+            ROUTE, PassengerInfo(Adults=1), (START, END)
+        )
+        pairs = sorted(
+            (total, departure, returns)
+            for departure, returns, total in matrix.pairs()
+            if 7 <= (returns - departure).days <= 10
+        )
+        cheapest = matrix.cheapest(3, min_stay=7, max_stay=10)
+        self.assertEqual([total for _, _, total in cheapest], [p[0] for p in pairs[:3]])
+        for departure, returns, total in cheapest:
+            self.assertTrue(7 <= (returns - departure).days <= 10)
+            self.assertEqual(matrix.price(departure, returns), total)
+        self.assertEqual(len(matrix.cheapest(10**6)), len(list(matrix.pairs())))
@@ -0,0 +1,158 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from typing import Callable
+
+from frenchbee import (
+    FrenchBee,
+    FrenchBeeData,
+    PassengerInfo,
+    Trip,
+    DateAndLocation,
+    Location,
+)
+from frenchbee.instrumentation import MetricsRecorder
+from frenchbee.transport import Transport
+
+from .replay import LocalServerAdapter, ReplayAdapter, StandInServer, mount
+
+
+def make_trip() -> Trip:
+    return Trip(
+        origin_depart=DateAndLocation(
+            date=datetime(2022, 10, 6), location=Location("EWR")
+        ),
+        destination_return=DateAndLocation(
+            date=datetime(2022, 10, 10), location=Location("ORY")
+        ),
+        passengers=PassengerInfo(Adults=1),
+    )
+
+
+def wait_for(predicate: Callable[[], bool], timeout: float = 5) -> None:
+    deadline: float = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.001)
+
+
+class ReplayTests(unittest.TestCase):
+    def setUp(self):
+        self.adapter = ReplayAdapter()
+        self.transport = mount(Transport(rate_limit=False), self.adapter)
+        self.client = FrenchBee(transport=self.transport)
+
+    def test_departure_and_return_info(self):
+        trip = make_trip()
+        departure = self.client.get_departure_info_for(trip)
+        self.assertEqual(departure.departure_airport, "EWR")
+        self.assertEqual(departure.day, datetime(2022, 10, 6))
+        self.assertGreater(departure.price, 0)
+
+        returns = self.client.get_return_info_for(trip)
+        self.assertEqual(returns.departure_airport, "ORY")
+        self.assertEqual(returns.day, datetime(2022, 10, 10))
+        self.assertEqual(len(self.adapter.requests), 2)
+
+    def test_flight_times(self):
+        trip = self.client.get_flight_times(make_trip())
+        self.assertEqual(len(trip.origin_segments), 12)
+        self.assertEqual(len(trip.destination_segments), 12)
+        segment = trip.origin_segments[0][0]
+        self.assertEqual(segment.flight_num, "721")
+        self.assertEqual(segment.start.location.code, "EWR")
+        self.assertEqual(segment.start.date, datetime(2022, 10, 7, 2, 55))
+        self.assertEqual(segment.start.location.transport, "Airbus A350-900")
+
+        form_post = self.adapter.requests[-1]
+        self.assertIn("reese84=3:fixture-token", form_post.headers["Cookie"])
+        self.assertIn("EXTERNAL_ID=BOOKING%26US%26EN", form_post.body)
+
+    def test_instrumentation_and_debug_dump(self):
+        recorder = MetricsRecorder()
+        debug_dir = tempfile.mkdtemp()
+        client = FrenchBee(
+            transport=self.transport, instrumentation=recorder, debug_dir=debug_dir
+        )
+        client.get_flight_times(make_trip())
+
+        metrics = recorder.metrics()
+        self.assertEqual(
+            sorted(metrics),
+            ["bounds", "form_parameters", "form_post", "search", "segments", "token"],
+        )
+        self.assertEqual(
+            {stage: values["calls"] for stage, values in metrics.items()},
+            {
+                "bounds": 3,  # one per bound and one for the rest
+                "form_parameters": 1,
+                "form_post": 1,
+                "search": 1,
+                "segments": 2,  # one per bound
+                "token": 1,
+            },
+        )
+        self.assertGreater(metrics["bounds"]["bytes"], 0)
+        self.assertIn(
+            'frenchbee_stage_calls_total{stage="bounds"} 3', recorder.prometheus()
+        )
+        self.assertEqual(os.listdir(debug_dir), ["EWR-ORY-2022-10-06-2022-10-10.json"])
+
+    def test_bounds_span_leaves_out_the_callers_time(self):
+        recorder = MetricsRecorder()
+        client = FrenchBee(transport=self.transport, instrumentation=recorder)
+        for _ in client.iter_flight_times(make_trip()):
+            time.sleep(0.01)
+        self.assertLess(recorder.metrics()["bounds"]["seconds"], 0.2)
+
+    def test_streamed_flight_times_do_not_share_locations(self):
+        options = list(self.client.iter_flight_times(make_trip()))
+        self.assertEqual([bound for bound, _ in options], [0] * 12 + [1] * 12)
+        first, second = options[0][1][0], options[1][1][0]
+        self.assertEqual(first.start.location.code, "EWR")
+        self.assertEqual(first.end.location, second.end.location)
+        first.end.location.terminal = "X"
+        self.assertNotEqual(second.end.location.terminal, "X")
+
+    def test_concurrent_identical_searches_are_coalesced(self):
+        send = self.adapter.send
+        release = threading.Event()
+
+        def held_send(request, **kwargs):
+            release.wait(5)  # until every caller has joined the leader's call
+            return send(request, **kwargs)
+
+        self.adapter.send = held_send
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [
+                executor.submit(self.client.get_departure_availability, make_trip())
+                for _ in range(8)
+            ]
+            wait_for(lambda: self.client.singleflight.stats.calls == 8)
+            release.set()
+            calendars = [future.result() for future in futures]
+        self.assertEqual(len(self.adapter.requests), 1)
+        self.assertEqual(self.client.singleflight.stats.coalesced, 7)
+        self.assertTrue(all(calendar == calendars[0] for calendar in calendars))
+
+    def test_locations(self):
+        locations = list(FrenchBeeData(self.transport).get_locations())
+        self.assertEqual(len(locations), 8)
+        self.assertEqual(locations[0].code, "EWR")
+        self.assertEqual(locations[6].name, "Saint-Denis, Réunion")
+
+
+class StandInServerTests(unittest.TestCase):
+    def test_flight_times(self):
+        with StandInServer() as server:
+            transport = mount(
+                Transport(rate_limit=False), LocalServerAdapter(server.url)
+            )
+            trip = FrenchBee(transport=transport).get_flight_times(make_trip())
+        self.assertEqual(len(trip.origin_segments), 12)
+        self.assertEqual(trip.destination_segments[0][0].end.location.code, "EWR")
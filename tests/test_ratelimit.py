@@ -0,0 +1,135 @@
+from typing import Any, List
+import unittest
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from frenchbee import BlockedError, CircuitOpenError, FrenchBee, PassengerInfo
+from frenchbee.ratelimit import CircuitBreaker, HostPolicy, RateLimiter, RetryPolicy
+from frenchbee.transport import Transport
+
+from .replay import mount
+
+
+class StatusAdapter(BaseAdapter):
+    """Answer requests with the given status codes in turn."""
+
+    def __init__(self, statuses: List[int]) -> None:
+        super().__init__()
+        self.statuses: List[int] = statuses
+        self.calls: int = 0
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        response: Response = Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = self.statuses[min(self.calls, len(self.statuses) - 1)]
+        response.headers["Retry-After"] = "0"
+        response._content = b"[]"
+        self.calls += 1
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class FailingAdapter(BaseAdapter):
+    """Raise the given exceptions in turn, then answer 200."""
+
+    def __init__(self, errors: List[Exception]) -> None:
+        super().__init__()
+        self.errors: List[Exception] = errors
+        self.calls: int = 0
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        response: Response = Response()
+        response.request = request
+        response.status_code = 200
+        response._content = b"[]"
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def make_transport(adapter: BaseAdapter, **kwargs: Any) -> Transport:
+    return mount(
+        Transport(retry=RetryPolicy(attempts=3, base_delay=0, max_delay=0), **kwargs),
+        adapter,
+    )
+
+
+class RetryTests(unittest.TestCase):
+    def test_retries_throttled_and_server_errors(self):
+        adapter = StatusAdapter([429, 503, 200])
+        transport = make_transport(adapter)
+        response = transport.session.get("https://us.frenchbee.com/en")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(adapter.calls, 3)
+        metrics = transport.metrics()["us.frenchbee.com"]
+        self.assertEqual(metrics["throttled"], 1)
+        self.assertEqual(metrics["server_errors"], 1)
+        self.assertEqual(metrics["retries"], 2)
+        self.assertEqual(metrics["successes"], 1)
+
+    def test_posts_are_only_retried_when_not_served(self):
+        url = "https://vols.frenchbee.com/plnext/FrenchBee/Override.action"
+        adapter = FailingAdapter([ConnectTimeout(), ReadTimeout()])
+        transport = make_transport(adapter)
+        with self.assertRaises(ReadTimeout):
+            transport.session.post(url)  # the connect timeout is retried
+        self.assertEqual(adapter.calls, 2)
+
+        refused = NewConnectionError(None, "Connection refused")
+        adapter = FailingAdapter([ConnectionError(MaxRetryError(None, url, refused))])
+        self.assertEqual(make_transport(adapter).session.post(url).status_code, 200)
+        self.assertEqual(adapter.calls, 2)
+
+        adapter = FailingAdapter([ConnectionError("Connection aborted.")])
+        with self.assertRaises(ConnectionError):
+            make_transport(adapter).session.post(url)
+        self.assertEqual(adapter.calls, 1)
+
+        adapter = StatusAdapter([502, 200])
+        self.assertEqual(make_transport(adapter).session.post(url).status_code, 502)
+        self.assertEqual(adapter.calls, 1)
+        adapter = StatusAdapter([429, 200])
+        self.assertEqual(make_transport(adapter).session.post(url).status_code, 200)
+        self.assertEqual(adapter.calls, 2)
+
+        adapter = FailingAdapter([ReadTimeout()])
+        transport = make_transport(adapter)
+        self.assertEqual(transport.session.get(url).status_code, 200)
+        adapter = FailingAdapter([ReadTimeout()])
+        transport = make_transport(adapter)
+        response = transport.session.post(url, idempotent=True)
+        self.assertEqual(response.status_code, 200)
+
+    def test_blocked_is_not_retried(self):
+        adapter = StatusAdapter([403])
+        client = FrenchBee(transport=make_transport(adapter))
+        with self.assertRaises(BlockedError):
+            client._make_search_request(
+                "EWR", "ORY", PassengerInfo(Adults=1), None, None, "op"
+            )
+        self.assertEqual(adapter.calls, 1)
+
+    def test_circuit_opens_after_failures(self):
+        adapter = StatusAdapter([500])
+        limiter = RateLimiter(
+            policies={
+                "vols.frenchbee.com": lambda: HostPolicy(breaker=CircuitBreaker(3))
+            }
+        )
+        transport = make_transport(adapter, limiter=limiter)
+        url = "https://vols.frenchbee.com/plnext/FrenchBee/Override.action"
+        self.assertEqual(transport.session.get(url).status_code, 500)
+        with self.assertRaises(CircuitOpenError):
+            transport.session.get(url)
+        self.assertEqual(adapter.calls, 3)
+        self.assertEqual(transport.metrics()["vols.frenchbee.com"]["circuit"], "open")
@@ -0,0 +1,118 @@
+import threading
+from typing import Any, Dict, List
+import unittest
+from unittest import mock
+
+from frenchbee.reese84 import FrenchBeeReese84, Reese84TokenManager
+from frenchbee.transport import Transport
+
+from .test_cache import Clock
+from .test_offline import wait_for
+
+
+class StubReese84(FrenchBeeReese84):
+    """Hands out token-1, token-2, ... once `release` is set."""
+
+    def __init__(self, ttl: float = 100) -> None:
+        super().__init__(Transport(rate_limit=False))
+        self.ttl: float = ttl
+        self.started: threading.Event = threading.Event()
+        self.release: threading.Event = threading.Event()
+        self.error: Exception = None
+        self.calls: int = 0
+
+    def fetch(self) -> Dict[str, Any]:
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return {"token": f"token-{self.calls}", "renewInSec": self.ttl}
+
+
+class TokenManagerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch("frenchbee.reese84.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.stub = StubReese84()
+        self.tokens = Reese84TokenManager(self.stub, refresh_margin=60)
+
+    def test_concurrent_callers_share_one_fetch(self):
+        results: List[str] = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.tokens.token()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        self.stub.started.wait(5)
+        wait_for(lambda: self.tokens.metrics.waits == 7)
+        self.stub.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["token-1"] * 8)
+        self.assertEqual(self.stub.calls, 1)
+        self.assertEqual(self.tokens.metrics.refreshes, 1)
+
+    def test_background_refresh_within_margin(self):
+        self.stub.release.set()
+        self.assertEqual(self.tokens.token(), "token-1")
+        self.clock.now += 30  # 70s left, outside the margin
+        self.assertEqual(self.tokens.token(), "token-1")
+        self.assertEqual(self.stub.calls, 1)
+
+        self.stub.release.clear()
+        self.stub.started.clear()
+        self.clock.now += 20  # 50s left: renewed in the background
+        self.assertEqual(self.tokens.token(), "token-1")
+        self.stub.started.wait(5)
+        self.assertEqual(self.tokens.token(), "token-1")  # still valid meanwhile
+        self.stub.release.set()
+        wait_for(lambda: self.tokens.metrics.refreshes == 2)
+        self.assertEqual(self.tokens.token(), "token-2")
+        self.assertEqual(self.stub.calls, 2)
+
+    def test_failure(self):
+        self.stub.error = ValueError("blocked")
+        self.stub.release.set()
+        with self.assertRaises(RuntimeError) as raised:
+            self.tokens.token()
+        self.assertIs(raised.exception.__cause__, self.stub.error)
+        self.assertEqual(self.tokens.metrics.failures, 1)
+        self.assertEqual(self.tokens.metrics.refreshes, 0)
+
+        self.stub.error = None
+        self.assertEqual(self.tokens.token(), "token-2")
+
+    def test_failed_background_refresh_backs_off(self):
+        self.stub.release.set()
+        self.assertEqual(self.tokens.token(), "token-1")
+        self.stub.error = ValueError("blocked")
+        self.clock.now += 50  # within the margin
+        for _ in range(5):
+            self.assertEqual(self.tokens.token(), "token-1")
+            wait_for(lambda: not self.tokens._refreshing)
+        self.assertEqual(self.stub.calls, 2)
+        self.assertEqual(self.tokens.metrics.failures, 1)
+
+        self.stub.error = None
+        self.clock.now += self.tokens.retry_delay
+        self.assertEqual(self.tokens.token(), "token-1")
+        wait_for(lambda: self.tokens.metrics.refreshes == 2)
+        self.assertEqual(self.tokens.token(), "token-3")
+
+    def test_invalidate(self):
+        self.stub.release.set()
+        self.assertEqual(self.tokens.token(), "token-1")
+        self.tokens.invalidate()
+        self.assertEqual(self.tokens.token(), "token-2")
+        self.assertEqual(self.stub.calls, 2)
+
+    def test_prefetch(self):
+        self.tokens.prefetch()
+        self.stub.started.wait(5)
+        self.stub.release.set()
+        self.assertEqual(self.tokens.token(), "token-1")
+        self.assertEqual(self.stub.calls, 1)
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from typing import List, Tuple
+import unittest
+
+from frenchbee import DateAndLocation, Location, PassengerInfo, Transport, Trip
+from frenchbee.search import search_round_trips
+
+from .test_sweep import replay_client
+
+START: datetime = datetime(2022, 10, 1)
+END: datetime = datetime(2022, 10, 31)
+
+
+class SearchTests(unittest.TestCase):
+    def setUp(self):
+        self.client = replay_client(Transport(rate_limit=False))
+
+    def brute_force(self, min_nights: int, max_nights: int) -> List[Tuple]:
+        trip: Trip = Trip(
+            origin_depart=DateAndLocation(date=None, location=Location("EWR")),
+            destination_return=DateAndLocation(date=None, location=Location("ORY")),
+            passengers=PassengerInfo(Adults=1),
+        )
+        trips: List[Tuple] = []
+        departures = self.client.get_departure_calendar(trip).between(START, END)
+        for departure in departures.to_flights().values():
+            trip.origin_depart.date = departure.day
+            returns = self.client.get_return_calendar(trip).between(
+                departure.day + timedelta(days=min_nights),
+                departure.day + timedelta(days=max_nights),
+            )
+            for flight in returns.to_flights().values():
+                trips.append(
+                    (departure.price + flight.price, departure.day, flight.day)
+                )
+        return sorted(trips)
+
+    def test_matches_brute_force(self):
+        expected = self.brute_force(7, 10)[:3]
+        for return_floor in (0.0, 200.0):
+            result = search_round_trips(
+                self.client,
+                "EWR",
+                "ORY",
+                START,
+                END,
+                7,
+                10,
+                count=3,
+                return_floor=return_floor,
+            )
+            self.assertEqual(
+                [(t.total, t.departure.day, t.returns.day) for t in result.trips],
+                expected,
+            )
+            for trip in result.trips:
+                self.assertTrue(7 <= trip.nights <= 10)
+            self.assertEqual(result.requests, 1 + result.departures_searched)
+
+        # a return floor within the cheapest return price prunes departures
+        self.assertGreater(result.departures_pruned, 0)
+
+    def test_max_requests(self):
+        result = search_round_trips(
+            self.client, "EWR", "ORY", START, END, 7, 10, max_requests=4
+        )
+        self.assertEqual(result.requests, 4)
+        self.assertEqual(result.departures_searched, 3)
+        self.assertGreater(result.departures_pruned, 0)
+        self.assertTrue(len(result.trips) > 0)
@@ -0,0 +1,68 @@
+from datetime import datetime
+import io
+import json
+import unittest
+
+from frenchbee.models import (
+    DateAndLocation,
+    Flight,
+    Location,
+    PassengerInfo,
+    Segment,
+    Trip,
+)
+from frenchbee.serialize import JsonLinesWriter, to_primitive
+
+
+def make_models():
+    segment = Segment(
+        airline_code="BF",
+        airline_name="French Bee",
+        flight_num="721",
+        duration=26700000,
+        start=DateAndLocation(
+            date=datetime(2022, 10, 6, 19, 55),
+            location=Location("EWR", "Newark", "B", "Airbus A350-900"),
+        ),
+        end=DateAndLocation(
+            date=datetime(2022, 10, 7, 9, 20), location=Location("ORY", "Orly", "4")
+        ),
+    )
+    trip = Trip(
+        origin_depart=DateAndLocation(
+            date=datetime(2022, 10, 6), location=Location("EWR")
+        ),
+        destination_return=DateAndLocation(date=None, location=Location("ORY")),
+        passengers=PassengerInfo(Adults=1),
+        origin_segments=[[segment], []],
+        destination_segments=[],
+    )
+    flight = Flight(
+        arrival_airport="ORY",
+        currency="USD",
+        day=datetime(2022, 10, 6),
+        departure_airport="EWR",
+        is_offer=False,
+        price=264.0,
+        tax=0.0,
+    )
+    return [trip, segment, flight, Location("EWR"), Location("ORY", "", None, "")]
+
+
+class SerializeTests(unittest.TestCase):
+    def test_same_shape_as_json_methods(self):
+        for model in make_models():
+            self.assertEqual(to_primitive(model), model.json(), model)
+
+    def test_writer(self):
+        models = make_models()
+        for backend in ("json", "orjson"):
+            stream = io.StringIO()
+            try:
+                JsonLinesWriter(stream, backend).write_all(models)
+            except ImportError:
+                continue
+            self.assertEqual(
+                [json.loads(line) for line in stream.getvalue().splitlines()],
+                [model.json() for model in models],
+            )
@@ -0,0 +1,124 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+import unittest
+from unittest import mock
+
+from frenchbee import cli
+from frenchbee.serve import CliServer, forward
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# cumulative import time of frenchbee.cli, generous enough for slow CI machines
+STARTUP_BUDGET_US: int = 250_000
+HEAVY_MODULES: List[str] = ["requests", "urllib3", "bs4", "jsonpath_ng"]
+
+
+def import_times(*args: str, env: Dict[str, str] = None) -> Dict[str, int]:
+    """Cumulative microseconds per module imported by `python -X importtime ...`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def write_catalog(cache_home: str) -> None:
+    os.makedirs(os.path.join(cache_home, "frenchbee"))
+    with open(os.path.join(cache_home, "frenchbee", "locations.json"), "w") as f:
+        json.dump(
+            {
+                "checked_at": time.time(),
+                "locations": [
+                    {"code": "EWR", "name": "Newark, NJ, United States"},
+                    {"code": "ORY", "name": "Paris - Orly, France"},
+                ],
+            },
+            f,
+        )
+
+
+class StartupTests(unittest.TestCase):
+    def test_cli_import_budget(self):
+        times = import_times("-c", "import frenchbee.cli")
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, times)
+        self.assertLess(times["frenchbee.cli"], STARTUP_BUDGET_US)
+
+    def test_cached_locations_skip_http_stack(self):
+        cache_home = tempfile.mkdtemp()
+        write_catalog(cache_home)
+        times = import_times(
+            "-m",
+            "frenchbee.cli",
+            "data",
+            "--locations",
+            env={"XDG_CACHE_HOME": cache_home},
+        )
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, times)
+
+
+class ServeTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        write_catalog(directory)
+        self.env = mock.patch.dict(os.environ, {"XDG_CACHE_HOME": directory})
+        self.env.start()
+        cli._shared.clear()
+        self.server = CliServer(os.path.join(directory, "cli.sock"), cli.main)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.env.stop()
+        cli._shared.clear()
+
+    def test_forward(self):
+        stdout = io.StringIO()
+        code = forward(self.server.path, ["data", "--locations", "--jsonl"], stdout)
+        self.assertEqual(code, 0)
+        self.assertEqual(
+            [json.loads(line)["code"] for line in stdout.getvalue().splitlines()],
+            ["EWR", "ORY"],
+        )
+
+        stderr = io.StringIO()
+        code = forward(self.server.path, ["flight", "EWR"], io.StringIO(), stderr)
+        self.assertEqual(code, 2)
+        self.assertIn("usage:", stderr.getvalue())
+
+    def test_no_server(self):
+        self.assertIsNone(forward(self.server.path + ".missing", ["data"]))
+
+    def test_server_runs_calls_itself(self):
+        # the server's own environment points at it, as when started from a shell
+        # that already uses it
+        os.environ[cli.SOCKET_ENV] = self.server.path
+        stdout = io.StringIO()
+        call = threading.Thread(
+            target=forward,
+            args=(self.server.path, ["data", "--locations", "--jsonl"], stdout),
+            daemon=True,
+        )
+        call.start()
+        call.join(timeout=5)
+        self.assertFalse(call.is_alive())
+        self.assertEqual(len(stdout.getvalue().splitlines()), 2)
@@ -0,0 +1,65 @@
+import json
+import os
+from typing import Iterator, List
+import unittest
+
+from frenchbee import FrenchBee
+from frenchbee.stream import get_proposed_bounds, iter_json_array
+
+FIXTURES: str = os.path.join(os.path.dirname(__file__), "fixtures")
+
+PAGE: str = (
+    "<script>PlnextPageProvider.init({\n  config : "
+    + json.dumps(
+        {
+            "meta": {"proposedBounds": [{"decoy": 1}]},
+            "pageDefinitionConfig": {
+                "pageCode": 'FPOW "proposedBounds": [',
+                "pageData": {
+                    "decoys": [{"proposedBounds": [{"decoy": 2}]}],
+                    "business": {
+                        "Availability": {
+                            "proposedBounds": [
+                                {"boundId": 0, "note": 'a "] {" string'},
+                                {"boundId": 1, "segments": [[], {}]},
+                            ]
+                        }
+                    },
+                },
+            },
+        }
+    )
+    + ",\n  pageEngine: {}});</script>"
+)
+
+EXPECTED: List[dict] = [
+    {"boundId": 0, "note": 'a "] {" string'},
+    {"boundId": 1, "segments": [[], {}]},
+]
+
+
+def split(text: str, size: int) -> Iterator[str]:
+    return (text[idx : idx + size] for idx in range(0, len(text), size))
+
+
+class StreamTests(unittest.TestCase):
+    def test_skips_arrays_under_other_paths(self):
+        for size in range(1, 40):
+            self.assertEqual(get_proposed_bounds(split(PAGE, size)), EXPECTED, size)
+
+    def test_missing_path(self):
+        with self.assertRaises(ValueError):
+            list(
+                iter_json_array(
+                    split(PAGE, 16), ("config",), ("pageDefinitionConfig", "missing")
+                )
+            )
+
+    def test_matches_full_parse(self):
+        with open(os.path.join(FIXTURES, "flight_times.html")) as f:
+            page: str = f.read()
+        script = FrenchBee()._get_flight_times_script(page)
+        expected = script["pageDefinitionConfig"]["pageData"]["business"][
+            "Availability"
+        ]["proposedBounds"]
+        self.assertEqual(get_proposed_bounds(split(page, 1000)), expected)
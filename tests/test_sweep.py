@@ -0,0 +1,55 @@
+from datetime import datetime
+import os
+import tempfile
+import unittest
+
+from frenchbee import FrenchBee, PassengerInfo
+from frenchbee.sweep import Sweep, plan
+from frenchbee.transport import Transport
+
+from .replay import ReplayAdapter, mount
+
+
+def replay_client(transport: Transport) -> FrenchBee:
+    return FrenchBee(transport=mount(transport, ReplayAdapter()))
+
+
+class SweepTests(unittest.TestCase):
+    def setUp(self):
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), "sweep.jsonl")
+        self.units = list(
+            plan(
+                [("EWR", "ORY"), ("ORY", "EWR")],
+                [PassengerInfo(Adults=1), PassengerInfo(Adults=2, Children=1)],
+                [datetime(2022, 10, 6)],
+            )
+        )
+
+    def sweep(self) -> Sweep:
+        return Sweep(
+            self.units,
+            processes=2,
+            concurrency=2,
+            chunk_size=3,
+            checkpoint=self.checkpoint,
+            client_factory=replay_client,
+        )
+
+    def test_sweep_and_resume(self):
+        self.assertEqual(len(self.units), 8)
+        results = list(self.sweep().run())
+        self.assertEqual(
+            sorted(result.unit.key for result in results),
+            sorted(unit.key for unit in self.units),
+        )
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertTrue(len(result.calendar) > 0)
+
+        self.assertEqual(list(self.sweep().run()), [])  # everything is checkpointed
+
+    def test_stopping_early_keeps_the_rest(self):
+        for _ in self.sweep().run():
+            break
+        self.assertEqual(len(self.sweep().completed()), 0)
+        self.assertEqual(len(list(self.sweep().run())), 8)
@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+import io
+import json
+import os
+import tempfile
+from typing import Dict, List
+import unittest
+from unittest import mock
+
+from frenchbee import PassengerInfo
+from frenchbee.models import Flight, Trip
+from frenchbee.watch import (
+    PriceWatcher,
+    WatchState,
+    WatchTarget,
+    default_interval,
+    split_bands,
+)
+
+from .test_cache import Clock
+
+TODAY: datetime = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class StubClient:
+    """Serves `calendar` as the availability of every trip."""
+
+    def __init__(self, days: int) -> None:
+        self.calendar: Dict[datetime, Flight] = {
+            TODAY + timedelta(days=offset): make_flight(offset, 100.0)
+            for offset in range(1, days + 1)
+        }
+        self.calls: int = 0
+
+    def get_departure_availability(self, trip: Trip) -> Dict[datetime, Flight]:
+        self.calls += 1
+        return self.calendar
+
+    get_return_availability = get_departure_availability
+
+
+def make_flight(offset: int, price: float, is_offer: bool = False) -> Flight:
+    return Flight(
+        arrival_airport="ORY",
+        currency="USD",
+        day=TODAY + timedelta(days=offset),
+        departure_airport="EWR",
+        is_offer=is_offer,
+        price=price,
+        tax=50.0,
+    )
+
+
+class WatchTests(unittest.TestCase):
+    def setUp(self):
+        self.client = StubClient(days=200)
+        self.target = WatchTarget("EWR", "ORY", PassengerInfo(Adults=1))
+
+    def changes(self, watcher: PriceWatcher, target: WatchTarget) -> List[tuple]:
+        return [
+            ((change.day - TODAY).days, change.change)
+            for change in watcher.poll(target)
+        ]
+
+    def test_changes(self):
+        watcher = PriceWatcher([self.target], client=self.client)
+        self.assertEqual(self.changes(watcher, self.target), [])
+        calendar = self.client.calendar
+        calendar[TODAY + timedelta(days=201)] = make_flight(201, 100.0)
+        calendar[TODAY + timedelta(days=2)] = make_flight(2, 80.0)
+        calendar[TODAY + timedelta(days=3)] = make_flight(3, 100.0, is_offer=True)
+        del calendar[TODAY + timedelta(days=4)]
+        self.assertEqual(
+            self.changes(watcher, self.target),
+            [(2, "price"), (3, "offer"), (201, "new"), (4, "removed")],
+        )
+        self.assertEqual(self.changes(watcher, self.target), [])
+
+    def test_empty_calendar_keeps_the_snapshot(self):
+        watcher = PriceWatcher([self.target], client=self.client)
+        watcher.poll(self.target)
+        calendar = self.client.calendar
+        for empty in (None, {}):
+            self.client.calendar = empty
+            self.assertEqual(watcher.poll(self.target), [])
+        self.client.calendar = calendar
+        self.assertEqual(watcher.poll(self.target), [])
+
+    def test_run_once_and_state_round_trip(self):
+        path = os.path.join(tempfile.mkdtemp(), "state.json")
+        targets = [
+            self.target,
+            WatchTarget("EWR", "ORY", PassengerInfo(Adults=1), TODAY),
+        ]
+        stream = io.StringIO()
+        PriceWatcher(targets, client=self.client, state=WatchState(path)).run(
+            stream, once=True, sleep=self.fail
+        )
+        self.assertEqual(self.client.calls, 2)
+        self.assertEqual(stream.getvalue(), "")
+
+        state = WatchState(path)
+        self.assertEqual(sorted(state.snapshots), sorted(t.key for t in targets))
+        day = f"{TODAY + timedelta(days=1):%Y-%m-%d}"
+        self.assertEqual(state.snapshots[self.target.key][day], (100.0, 50.0, False))
+
+        self.client.calendar[TODAY + timedelta(days=1)] = make_flight(1, 120.0)
+        PriceWatcher(targets, client=self.client, state=state).run(stream, once=True)
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(
+            [(line["target"], line["change"], line["old_price"]) for line in lines],
+            [(t.key, "price", 100.0) for t in targets],
+        )
+        self.assertEqual(WatchState(path).snapshots[self.target.key][day][0], 120.0)
+
+    def test_bands_poll_near_days_more_often(self):
+        near, middle, far, farthest = bands = split_bands(self.target)
+        self.assertEqual({band.key for band in bands}, {self.target.key})
+        for now in (TODAY, TODAY.replace(hour=9, minute=30)):
+            self.assertEqual(
+                [default_interval(300, band.horizon(now)) for band in bands],
+                [300, 600, 1200, 2400],
+            )
+
+        watcher = PriceWatcher(bands, client=self.client)
+        self.assertEqual(self.changes(watcher, near), [])  # baseline of every band
+        self.client.calendar[TODAY + timedelta(days=5)] = make_flight(5, 90.0)
+        self.client.calendar[TODAY + timedelta(days=100)] = make_flight(100, 90.0)
+
+        self.assertEqual(self.changes(watcher, near), [(5, "price")])
+        self.assertEqual(self.changes(watcher, middle), [])
+        self.assertEqual(self.changes(watcher, far), [(100, "price")])
+        self.assertEqual(self.changes(watcher, farthest), [])
+        self.assertEqual(self.changes(watcher, near), [])
+
+    def test_bands_share_one_fetch(self):
+        bands = split_bands(self.target)
+        PriceWatcher(bands, client=self.client).run(io.StringIO(), once=True)
+        self.assertEqual(self.client.calls, 1)
+
+        clock = Clock()
+
+        def sleep(seconds: float) -> None:
+            clock.now += seconds
+            if clock.now > 24 * 3600:
+                raise StopIteration
+
+        calls: List[int] = []
+        for targets in ([self.target], bands):
+            self.client.calls = 0
+            clock.now = 0.0
+            watcher = PriceWatcher(targets, client=self.client)
+            with mock.patch("frenchbee.watch.time", clock):
+                self.assertRaises(
+                    StopIteration, watcher.run, io.StringIO(), sleep=sleep
+                )
+            calls.append(self.client.calls)
+        self.assertEqual(calls, [24 * 3600 // 300 + 1] * 2)